@@ -0,0 +1,316 @@
+"""Tiered storage for audit_logs: old rows move out of SQLite into compressed segment files.
+
+Layout of AUDIT_ARCHIVE_DIR:
+    audit-<min_id>-<max_id>.jsonl.gz   one JSON object per archived row, ascending id
+    index.json                         [{file, min_id, max_id, min_created_at, max_created_at, rows,
+                                         user_ids, actions, entity_types}]
+
+user_ids / actions / entity_types are the distinct values in the segment, so filtered reads
+(e.g. /engine/audit/me) skip segments that cannot match without decompressing them. Indexes
+written before these fields existed are completed on the next archive run; until then such
+segments are scanned.
+
+Reads keep only the filterable columns of recently used segments in memory (_segment_columns),
+pick the matching rows from those and decode just those lines of the segment file.
+
+Segments are written once and never modified. A run archives every row up to the newest row
+older than the cutoff, so archived ids are always below the ids still in the hot table and
+keyset pages can continue from the table straight into the archive.
+
+    python -m app.core.audit_archive --days 90 [--vacuum]
+"""
+import argparse
+import gzip
+import json
+import os
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+import numpy as np
+
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app import models
+
+_COLUMNS = ("id", "user_id", "action", "entity_type", "entity_id", "request_json", "response_json", "created_at")
+_FILTER_KEYS = {"user_ids": "user_id", "actions": "action", "entity_types": "entity_type"}
+_archive_lock = threading.Lock()
+_index_lock = threading.Lock()
+_index_cache: tuple[tuple, list[dict]] | None = None
+
+
+def _archive_dir() -> str:
+    return settings.AUDIT_ARCHIVE_DIR
+
+
+def _load_segment_meta(seg: dict) -> dict:
+    # filter value lists become sets for membership tests
+    return {**seg, **{k: frozenset(seg[k]) for k in _FILTER_KEYS if k in seg}}
+
+
+def load_index() -> list[dict]:
+    """Segment index, cached until index.json changes on disk. Callers must not mutate it."""
+    global _index_cache
+    path = os.path.join(_archive_dir(), "index.json")
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return []
+    key = (path, st.st_ino, st.st_mtime_ns, st.st_size)
+    with _index_lock:
+        if _index_cache is not None and _index_cache[0] == key:
+            return _index_cache[1]
+    with open(path, encoding="utf-8") as f:
+        index = [_load_segment_meta(seg) for seg in json.load(f)]
+    with _index_lock:
+        _index_cache = (key, index)
+    return index
+
+
+def _write_index(index: list[dict]):
+    path = os.path.join(_archive_dir(), "index.json")
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=1, default=sorted)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _write_segment(rows: list[dict]) -> dict:
+    name = f"audit-{rows[0]['id']:012d}-{rows[-1]['id']:012d}.jsonl.gz"
+    path = os.path.join(_archive_dir(), name)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb") as gz:
+            for row in rows:
+                gz.write(json.dumps(row, ensure_ascii=False, default=str).encode("utf-8") + b"\n")
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(tmp, path)
+    created = [row["created_at"] for row in rows if row["created_at"]]
+    return {
+        "file": name,
+        "min_id": rows[0]["id"],
+        "max_id": rows[-1]["id"],
+        "min_created_at": min(created) if created else None,
+        "max_created_at": max(created) if created else None,
+        "rows": len(rows),
+        **_filter_values(rows),
+    }
+
+
+def _filter_values(rows) -> dict:
+    values: dict[str, set] = {k: set() for k in _FILTER_KEYS}
+    for row in rows:
+        for k, col in _FILTER_KEYS.items():
+            if row[col] is not None:
+                values[k].add(row[col])
+    return {k: frozenset(v) for k, v in values.items()}
+
+
+def _complete_index(index: list[dict]) -> bool:
+    """Add missing filter value sets to segments indexed by older versions; True if any changed."""
+    changed = False
+    for i, seg in enumerate(index):
+        if not all(k in seg for k in _FILTER_KEYS):
+            index[i] = {**seg, **_filter_values(_iter_segment(_segment_path(seg["file"])))}
+            changed = True
+    return changed
+
+
+def archive_audit_logs(db: Session, older_than_days: int | None = None, segment_rows: int | None = None) -> dict:
+    """Move audit rows older than the cutoff into new segment files and delete them from the table."""
+    days = older_than_days if older_than_days is not None else settings.AUDIT_ARCHIVE_AFTER_DAYS
+    segment_rows = segment_rows or settings.AUDIT_ARCHIVE_SEGMENT_ROWS
+    cutoff = datetime.utcnow() - timedelta(days=days)
+
+    with _archive_lock:
+        os.makedirs(_archive_dir(), exist_ok=True)
+        index = list(load_index())
+        if _complete_index(index):
+            _write_index(index)
+        archived_max = max((seg["max_id"] for seg in index), default=0)
+
+        # a previous run may have written its segment but died before deleting the rows
+        if archived_max:
+            db.execute(delete(models.AuditLog).where(models.AuditLog.id <= archived_max))
+            db.commit()
+
+        upto_id = db.scalar(select(func.max(models.AuditLog.id)).where(models.AuditLog.created_at < cutoff))
+        # audit_logs.id is a plain rowid (next id = max(id) + 1): keep the newest row in the table
+        # so archived ids are never handed out again
+        newest_id = db.scalar(select(func.max(models.AuditLog.id)))
+        if upto_id is not None and upto_id >= newest_id:
+            upto_id = newest_id - 1
+        if upto_id is None or upto_id <= archived_max:
+            return {"segments": 0, "rows": 0, "cutoff": cutoff.isoformat()}
+
+        cols = [getattr(models.AuditLog, c) for c in _COLUMNS]
+        new_segments = []
+        after_id = archived_max
+        while True:
+            rows = db.execute(
+                select(*cols)
+                .where(models.AuditLog.id > after_id, models.AuditLog.id <= upto_id)
+                .order_by(models.AuditLog.id)
+                .limit(segment_rows)
+            ).all()
+            if not rows:
+                break
+            batch = [
+                dict(zip(_COLUMNS, r), created_at=r.created_at.isoformat() if r.created_at else None)
+                for r in rows
+            ]
+            seg = _write_segment(batch)
+            index.append(seg)
+            _write_index(index)
+            db.execute(delete(models.AuditLog).where(models.AuditLog.id >= seg["min_id"], models.AuditLog.id <= seg["max_id"]))
+            db.commit()
+            new_segments.append(seg)
+            after_id = seg["max_id"]
+
+    return {
+        "segments": len(new_segments),
+        "rows": sum(seg["rows"] for seg in new_segments),
+        "cutoff": cutoff.isoformat(),
+    }
+
+
+def _segment_path(name: str) -> str:
+    return os.path.join(_archive_dir(), name)
+
+
+def _iter_segment(path: str):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            yield json.loads(line)
+
+
+@dataclass(frozen=True)
+class _SegmentColumns:
+    """The filterable columns of one segment, in file (ascending id) order."""
+    ids: np.ndarray
+    user_ids: np.ndarray  # -1 = NULL
+    actions: np.ndarray  # codes into action_codes, -1 = NULL
+    entity_types: np.ndarray  # codes into entity_codes, -1 = NULL
+    created_at: np.ndarray  # datetime64[us], NaT = NULL
+    action_codes: dict
+    entity_codes: dict
+
+
+@lru_cache(maxsize=settings.AUDIT_ARCHIVE_COLUMN_CACHE_SEGMENTS)
+def _segment_columns(path: str) -> _SegmentColumns:
+    # segments are immutable, so their columns can be cached by path: about 32 bytes per row,
+    # the request/response JSON is never kept
+    ids, user_ids, actions, entity_types, created_at = [], [], [], [], []
+    action_codes: dict[str, int] = {}
+    entity_codes: dict[str, int] = {}
+    for row in _iter_segment(path):
+        ids.append(row["id"])
+        user_ids.append(-1 if row["user_id"] is None else row["user_id"])
+        actions.append(-1 if row["action"] is None else action_codes.setdefault(row["action"], len(action_codes)))
+        entity_types.append(-1 if row["entity_type"] is None else entity_codes.setdefault(row["entity_type"], len(entity_codes)))
+        created_at.append(row["created_at"] or "NaT")
+    return _SegmentColumns(
+        ids=np.array(ids, dtype=np.int64),
+        user_ids=np.array(user_ids, dtype=np.int64),
+        actions=np.array(actions, dtype=np.int32),
+        entity_types=np.array(entity_types, dtype=np.int32),
+        created_at=np.array(created_at, dtype="datetime64[us]"),
+        action_codes=action_codes,
+        entity_codes=entity_codes,
+    )
+
+
+def _read_rows(path: str, positions: set[int]) -> dict[int, dict]:
+    """Decode only the rows at `positions` (line numbers) of a segment."""
+    out: dict[int, dict] = {}
+    last = max(positions)
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for pos, line in enumerate(f):
+            if pos in positions:
+                out[pos] = json.loads(line)
+            if pos >= last:
+                break
+    return out
+
+
+def _segment_may_match(seg: dict, user_id: int | None, action: str | None, entity_type: str | None) -> bool:
+    for key, value in (("user_ids", user_id), ("actions", action), ("entity_types", entity_type)):
+        if value is not None and key in seg and value not in seg[key]:
+            return False
+    return True
+
+
+def read_archived(
+    before_id: int | None,
+    limit: int,
+    user_id: int | None = None,
+    action: str | None = None,
+    entity_type: str | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+) -> list[dict]:
+    """Archived rows matching the filters with id < before_id, newest first, at most `limit`."""
+    lo = created_from.isoformat() if created_from else None
+    hi = created_to.isoformat() if created_to else None
+    out: list[dict] = []
+    for seg in sorted(load_index(), key=lambda s: s["max_id"], reverse=True):
+        if before_id is not None and seg["min_id"] >= before_id:
+            continue
+        if lo and seg["max_created_at"] and seg["max_created_at"] < lo:
+            continue
+        if hi and seg["min_created_at"] and seg["min_created_at"] >= hi:
+            continue
+        if not _segment_may_match(seg, user_id, action, entity_type):
+            continue
+        path = _segment_path(seg["file"])
+        cols = _segment_columns(path)
+        mask = np.ones(len(cols.ids), dtype=bool)
+        if before_id is not None:
+            mask &= cols.ids < before_id
+        if user_id is not None:
+            mask &= cols.user_ids == user_id
+        if action is not None:
+            mask &= cols.actions == cols.action_codes.get(action, -2)
+        if entity_type is not None:
+            mask &= cols.entity_types == cols.entity_codes.get(entity_type, -2)
+        if lo:
+            mask &= cols.created_at >= np.datetime64(lo, "us")
+        if hi:
+            mask &= cols.created_at < np.datetime64(hi, "us")
+        positions = np.flatnonzero(mask)[::-1][: limit - len(out)].tolist()
+        if not positions:
+            continue
+        rows = _read_rows(path, set(positions))
+        out.extend(rows[p] for p in positions)
+        if len(out) >= limit:
+            return out
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive old audit_logs rows into compressed segment files.")
+    parser.add_argument("--days", type=int, default=settings.AUDIT_ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--vacuum", action="store_true", help="VACUUM the database afterwards to shrink the file")
+    args = parser.parse_args()
+
+    from app.database import SessionLocal, engine
+
+    db = SessionLocal()
+    try:
+        print(archive_audit_logs(db, older_than_days=args.days))
+    finally:
+        db.close()
+    if args.vacuum:
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("VACUUM"))
+
+
+if __name__ == "__main__":
+    main()
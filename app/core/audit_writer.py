@@ -0,0 +1,189 @@
+import json
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.database import SessionLocal
+from app import models
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class AuditRecord:
+    """What an endpoint hands over; request/response stay as objects until the writer serializes them."""
+    user_id: int
+    action: str
+    entity_type: str | None
+    entity_id: int | None
+    request: Any
+    response: Any
+    created_at: datetime
+
+
+def _dumps(obj: Any) -> str:
+    if hasattr(obj, "model_dump"):
+        obj = obj.model_dump()
+    return json.dumps(obj, ensure_ascii=False, default=str)
+
+
+def _to_row(rec: AuditRecord) -> dict:
+    return {
+        "user_id": rec.user_id,
+        "action": rec.action,
+        "entity_type": rec.entity_type,
+        "entity_id": rec.entity_id,
+        "request_json": _dumps(rec.request),
+        "response_json": _dumps(rec.response),
+        "created_at": rec.created_at,
+    }
+
+
+def write_audit(db: Session, rec: AuditRecord) -> int:
+    """Synchronous path: add the row to the caller's session/transaction and return its id."""
+    audit = models.AuditLog(**_to_row(rec))
+    db.add(audit)
+    db.flush()
+    return audit.id
+
+
+class AuditWriter:
+    """Background thread that bulk-inserts queued audit records.
+
+    A batch is written when it reaches `batch_size` records or `flush_interval` seconds after
+    its first record, whichever comes first. The queue is bounded: submit() returns False
+    when the writer is not running or the queue is full, and the caller writes synchronously.
+    A batch whose bulk insert fails twice is retried record by record through write_audit, so
+    one bad record (or a transient error) only loses that record. stop() drains everything
+    still queued before returning.
+    """
+
+    def __init__(self, max_queue: int, batch_size: int, flush_interval: float, session_factory=SessionLocal):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.session_factory = session_factory
+        self._queue: queue.Queue[AuditRecord] = queue.Queue(maxsize=max_queue)
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.written = 0
+        self.written_one_by_one = 0
+        self.dropped = 0
+        self.rejected = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive() and not self._stopping.is_set()
+
+    def start(self):
+        if self.running:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join(timeout)
+        self._thread = None
+        # anything that raced in after the thread exited
+        self._drain()
+
+    def submit(self, rec: AuditRecord) -> bool:
+        if not self.running:
+            self.rejected += 1
+            return False
+        try:
+            self._queue.put_nowait(rec)
+            return True
+        except queue.Full:
+            self.rejected += 1
+            return False
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "written_one_by_one": self.written_one_by_one,
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+        }
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            batch = [first]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._write(batch)
+        self._drain()
+
+    def _drain(self):
+        batch: list[AuditRecord] = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+            if len(batch) >= self.batch_size:
+                self._write(batch)
+                batch = []
+        if batch:
+            self._write(batch)
+
+    def _write(self, batch: list[AuditRecord]):
+        for attempt in (1, 2):
+            db = self.session_factory()
+            try:
+                db.execute(insert(models.AuditLog), [_to_row(rec) for rec in batch])
+                db.commit()
+                self.written += len(batch)
+                return
+            except Exception:
+                db.rollback()
+                logger.exception("audit batch insert failed (attempt %s, %s rows)", attempt, len(batch))
+            finally:
+                db.close()
+        for rec in batch:
+            self._write_one(rec)
+
+    def _write_one(self, rec: AuditRecord):
+        db = self.session_factory()
+        try:
+            write_audit(db, rec)
+            db.commit()
+            self.written += 1
+            self.written_one_by_one += 1
+        except Exception:
+            db.rollback()
+            self.dropped += 1
+            logger.exception("audit record dropped (user_id=%s, action=%s, entity_id=%s)", rec.user_id, rec.action, rec.entity_id)
+        finally:
+            db.close()
+
+
+audit_writer = AuditWriter(
+    max_queue=settings.AUDIT_QUEUE_MAX,
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_interval=settings.AUDIT_FLUSH_INTERVAL_SECONDS,
+)
@@ -5,4 +5,69 @@ class Settings(BaseModel):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24  # 24 hours (dev-friendly)
 
+    # Password hashing (app/core/hash_pool.py). argon2 runs in a process pool of
+    # PASSWORD_HASH_WORKERS (0 = in the request's threadpool); once PASSWORD_HASH_MAX_IN_FLIGHT
+    # hashes are queued or running, register/login answer 429 instead of queueing more.
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_IN_FLIGHT: int = 32
+    # argon2id cost; calibrate with: python -m app.core.hash_pool --calibrate --target-ms 50
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST_KIB: int = 65_536
+    ARGON2_PARALLELISM: int = 4
+
+    # get_current_user principal cache (app/core/principal_cache.py); the TTL bounds how long
+    # another worker may keep serving a role/active change made through a different worker
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10_000
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 30.0
+
+    # Stateless auth (app/core/token_denylist.py): access tokens carry role/active claims and
+    # get_current_user trusts them without a DB read. Access tokens are then short-lived and
+    # renewed through POST /auth/refresh; role/active changes revoke a user's earlier tokens
+    # through an in-memory deny-list reloaded from token_revocations every
+    # TOKEN_DENYLIST_REFRESH_SECONDS (the window in which another worker may still accept them).
+    AUTH_STATELESS: bool = False
+    STATELESS_ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 14
+    TOKEN_DENYLIST_REFRESH_SECONDS: float = 5.0
+
+    # Audit log writer (app/core/audit_writer.py)
+    AUDIT_ASYNC: bool = True  # False = audit rows are written inline, in the request's transaction
+    AUDIT_QUEUE_MAX: int = 10_000
+    AUDIT_BATCH_SIZE: int = 200
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 0.5
+
+    # build_plan result cache (app/core/plan_cache.py)
+    PLAN_CACHE_MAX_ENTRIES: int = 5_000
+    PLAN_CACHE_TTL_SECONDS: float = 15.0
+
+    # Audit archival (app/core/audit_archive.py)
+    AUDIT_ARCHIVE_DIR: str = "./audit_archive"
+    AUDIT_ARCHIVE_AFTER_DAYS: int = 90
+    AUDIT_ARCHIVE_SEGMENT_ROWS: int = 50_000
+    # segments whose filter columns (~32 bytes/row) stay cached in memory for archive reads
+    AUDIT_ARCHIVE_COLUMN_CACHE_SEGMENTS: int = 16
+
+    # In-memory daily lockout index (app/core/lockout_index.py); 0 = entries never expire (single worker)
+    LOCKOUT_INDEX_TTL_SECONDS: float = 5.0
+
+    # In-memory SymbolSpec registry (app/core/symbol_specs.py); reloaded from the DB after this
+    # many seconds so edits made through another worker are picked up. 0 = never (single worker)
+    SYMBOL_SPEC_REGISTRY_TTL_SECONDS: float = 60.0
+
+    # PnL backfill job (app/core/pnl_backfill.py): entries re-priced and committed per chunk
+    PNL_BACKFILL_CHUNK_ROWS: int = 5_000
+
+    # Streaming CSV/JSONL exports (app/core/export.py): rows fetched and written per batch
+    EXPORT_BATCH_ROWS: int = 1_000
+
+    # Journal analytics results cached per (user_id, finalized-trade fingerprint, query)
+    JOURNAL_ANALYTICS_CACHE_MAX_ENTRIES: int = 1_024
+
+    # POST /trading/journal/import: rows validated/inserted per chunk, hard cap per upload
+    JOURNAL_IMPORT_CHUNK_ROWS: int = 1_000
+    JOURNAL_IMPORT_MAX_ROWS: int = 100_000
+
+    # Emit per-gate timings of /engine/plan, /plan/batch and /commit as a Server-Timing header
+    ENGINE_SERVER_TIMING: bool = False
+
 settings = Settings()
@@ -0,0 +1,141 @@
+from datetime import datetime, timedelta
+from typing import Iterable
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.core.lockout_index import DailyState
+from app import models
+
+
+def daily_loss_limit(rp: models.RiskProfile | None) -> float | None:
+    if rp is None:
+        return None
+    return abs(rp.account_balance * (rp.max_daily_loss_pct / 100.0))
+
+
+def loss_streak(pnls: Iterable[float]) -> tuple[int, bool]:
+    """(losses after the last win, whether a win occurred) for pnls in close order.
+
+    A loss extends the streak, a win resets it, breakeven leaves it alone.
+    """
+    trailing, broken = 0, False
+    for pnl in pnls:
+        if pnl < 0:
+            trailing += 1
+        elif pnl > 0:
+            trailing, broken = 0, True
+    return trailing, broken
+
+
+def apply_trade_results(
+    db: Session,
+    user_id: int,
+    day: str,
+    pnls: list[float],
+    loss_limit: float | None = None,
+) -> DailyState:
+    """Add closed trades (in close order) to (user_id, day) in ONE upsert; return the post-update row.
+
+    realized_pnl, trades_today and consecutive_losses are updated in SQL (x = x + delta), and the
+    lockout flag is evaluated against the updated total inside the same statement, so concurrent
+    finalizes never lose updates and the caller gets the new lockout state without a second read.
+    """
+    dm = models.DailyMetric.__table__.c
+    total = float(sum(pnls))
+    trailing, broken = loss_streak(pnls)
+
+    new_total = func.coalesce(dm.realized_pnl, 0.0) + total
+    streak = trailing if broken else func.coalesce(dm.consecutive_losses, 0) + trailing
+    if loss_limit is not None:
+        locked = or_(func.coalesce(dm.locked_out, False), new_total <= -loss_limit)
+        locked_init = total <= -loss_limit
+    else:
+        locked, locked_init = func.coalesce(dm.locked_out, False), False
+
+    now = datetime.utcnow()
+    stmt = (
+        sqlite_insert(models.DailyMetric)
+        .values(
+            user_id=user_id,
+            day=day,
+            realized_pnl=total,
+            trades_today=len(pnls),
+            consecutive_losses=trailing,
+            locked_out=locked_init,
+            created_at=now,
+        )
+        .on_conflict_do_update(
+            index_elements=["user_id", "day"],
+            set_={
+                "realized_pnl": new_total,
+                "trades_today": func.coalesce(dm.trades_today, 0) + len(pnls),
+                "consecutive_losses": streak,
+                "locked_out": locked,
+                "updated_at": now,
+            },
+        )
+        .returning(dm.locked_out, dm.realized_pnl, dm.trades_today, dm.consecutive_losses)
+    )
+    row = db.execute(stmt).one()
+    return DailyState(
+        locked_out=bool(row.locked_out),
+        realized_pnl=float(row.realized_pnl or 0.0),
+        trades_today=int(row.trades_today or 0),
+        consecutive_losses=int(row.consecutive_losses or 0),
+    )
+
+
+def rebuild_daily_metric(db: Session, user_id: int, day: str, loss_limit: float | None = None) -> DailyState:
+    """Recompute (user_id, day) from the finalized entries closed on that UTC day.
+
+    Counters are replaced, not incremented. An existing lockout is kept: lockouts are only
+    lifted by an explicit unlock / reset-today.
+    """
+    j = models.TradeJournalEntry
+    start = datetime.strptime(day, "%Y-%m-%d")
+    pnls = [
+        float(p or 0.0)
+        for p in db.execute(
+            select(j.pnl)
+            .where(j.user_id == user_id, j.is_finalized == True, j.closed_at >= start, j.closed_at < start + timedelta(days=1))
+            .order_by(j.closed_at, j.id)
+        ).scalars()
+    ]
+    total = float(sum(pnls))
+    trailing, _ = loss_streak(pnls)
+    breached = loss_limit is not None and total <= -loss_limit
+
+    dm = models.DailyMetric.__table__.c
+    now = datetime.utcnow()
+    stmt = (
+        sqlite_insert(models.DailyMetric)
+        .values(
+            user_id=user_id,
+            day=day,
+            realized_pnl=total,
+            trades_today=len(pnls),
+            consecutive_losses=trailing,
+            locked_out=breached,
+            created_at=now,
+        )
+        .on_conflict_do_update(
+            index_elements=["user_id", "day"],
+            set_={
+                "realized_pnl": total,
+                "trades_today": len(pnls),
+                "consecutive_losses": trailing,
+                "locked_out": or_(func.coalesce(dm.locked_out, False), breached),
+                "updated_at": now,
+            },
+        )
+        .returning(dm.locked_out, dm.realized_pnl, dm.trades_today, dm.consecutive_losses)
+    )
+    row = db.execute(stmt).one()
+    return DailyState(
+        locked_out=bool(row.locked_out),
+        realized_pnl=float(row.realized_pnl or 0.0),
+        trades_today=int(row.trades_today or 0),
+        consecutive_losses=int(row.consecutive_losses or 0),
+    )
@@ -0,0 +1,136 @@
+"""Bounded executor for argon2 password hashing.
+
+argon2 is CPU-bound by design (tens of ms per hash). Running it in FastAPI's shared
+threadpool lets a burst of logins occupy the worker threads every sync endpoint needs, so
+register/login are async and hand the hash to this pool instead:
+
+- a process pool of PASSWORD_HASH_WORKERS runs the hashes in parallel, outside the GIL
+  (PASSWORD_HASH_WORKERS = 0 runs them in the threadpool instead);
+- at most PASSWORD_HASH_MAX_IN_FLIGHT hashes may be queued or running; beyond that the
+  request fails fast with 429 and Retry-After rather than waiting in a queue.
+
+Cost parameters live in settings (ARGON2_*); to pick them for a machine:
+
+    python -m app.core.hash_pool --calibrate --target-ms 50
+"""
+import argparse
+import asyncio
+import multiprocessing
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.security import get_password_hash, verify_password
+
+
+class HashPool:
+    def __init__(self, workers: int, max_in_flight: int):
+        self.workers = workers
+        self.max_in_flight = max_in_flight
+        self._executor: ProcessPoolExecutor | None = None
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def start(self):
+        if self.workers > 0 and self._executor is None:
+            # spawn, not fork: the parent already runs threads (audit writer). Spawned workers
+            # re-import the launching script, so scripts that serve the app in-process need an
+            # `if __name__ == "__main__":` guard (the uvicorn CLI has one).
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def stop(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    async def _run(self, fn, *args):
+        # only touched from the event loop thread, so the counter needs no lock
+        if self.in_flight >= self.max_in_flight:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=429,
+                detail="Too many concurrent authentication requests, retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            if self._executor is None:
+                return await run_in_threadpool(fn, *args)
+            return await asyncio.wrap_future(self._executor.submit(fn, *args))
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, password, hashed_password)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "mode": "process" if self._executor is not None else "thread",
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+
+hash_pool = HashPool(workers=settings.PASSWORD_HASH_WORKERS, max_in_flight=settings.PASSWORD_HASH_MAX_IN_FLIGHT)
+
+
+def _time_hash_ms(time_cost: int, memory_kib: int, parallelism: int, samples: int) -> float:
+    from passlib.hash import argon2
+
+    hasher = argon2.using(rounds=time_cost, memory_cost=memory_kib, parallelism=parallelism)
+    times = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        hasher.hash("calibration-password")
+        times.append((time.perf_counter() - start) * 1000.0)
+    return statistics.median(times)
+
+
+def calibrate(target_ms: float, memory_kib: int, parallelism: int, samples: int = 5, max_time_cost: int = 20) -> dict:
+    """Largest time_cost whose median hash time stays within target_ms at the given memory cost."""
+    chosen = None
+    for time_cost in range(1, max_time_cost + 1):
+        ms = _time_hash_ms(time_cost, memory_kib, parallelism, samples)
+        print(f"time_cost={time_cost:<3} memory={memory_kib} KiB parallelism={parallelism}: {ms:.1f} ms")
+        if ms > target_ms:
+            break
+        chosen = {"ARGON2_TIME_COST": time_cost, "ARGON2_MEMORY_COST_KIB": memory_kib, "ARGON2_PARALLELISM": parallelism, "median_ms": round(ms, 1)}
+    return chosen or {"ARGON2_TIME_COST": 1, "ARGON2_MEMORY_COST_KIB": memory_kib, "ARGON2_PARALLELISM": parallelism, "median_ms": None}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibrate argon2 cost parameters for this machine.")
+    parser.add_argument("--calibrate", action="store_true")
+    parser.add_argument("--target-ms", type=float, default=50.0, help="hash time budget per login")
+    parser.add_argument("--memory-kib", type=int, default=settings.ARGON2_MEMORY_COST_KIB)
+    parser.add_argument("--parallelism", type=int, default=settings.ARGON2_PARALLELISM)
+    parser.add_argument("--samples", type=int, default=5)
+    args = parser.parse_args()
+    if not args.calibrate:
+        parser.error("nothing to do (use --calibrate)")
+
+    result = calibrate(args.target_ms, args.memory_kib, args.parallelism, args.samples)
+    print("\nset in app/core/config.py:")
+    for key in ("ARGON2_TIME_COST", "ARGON2_MEMORY_COST_KIB", "ARGON2_PARALLELISM"):
+        print(f"    {key} = {result[key]}")
+    if result["median_ms"] is None:
+        print(f"(even time_cost=1 exceeds {args.target_ms} ms; lower --memory-kib)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""Journal analytics: equity curve, drawdown, win rate, profit factor, expectancy and R-multiples.
+
+Finalized trades are fetched column-wise (id, closed_at, pnl, planned risk) in close order and
+every statistic is computed with NumPy over those columns; no ORM objects are built.
+
+Results are cached in-process per (user_id, finalized-trade fingerprint, query). The fingerprint
+is (count, max id) of the user's finalized entries, read with one aggregate over
+ix_trade_journal_entries_user_id_finalized_closed_at. Entries only ever become finalized, so every
+finalize changes it; jobs that rewrite pnl of already finalized rows must call
+journal_analytics_cache.invalidate(user_id).
+"""
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.pagination import as_utc_naive
+from app import models, schemas
+
+# R-multiple bucket edges; a value equal to an edge falls in the bucket above it
+R_EDGES = np.array([-2.0, -1.0, -0.5, 0.0, 0.5, 1.0, 2.0, 3.0])
+
+
+class AnalyticsCache:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, schemas.JournalAnalyticsOut] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: tuple, value: schemas.JournalAnalyticsOut):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int | None = None):
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if k[0] == user_id]:
+                    del self._entries[key]
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "max_entries": self.max_entries, "hits": self.hits, "misses": self.misses}
+
+
+journal_analytics_cache = AnalyticsCache(max_entries=settings.JOURNAL_ANALYTICS_CACHE_MAX_ENTRIES)
+
+
+def _finalized_filter(user_id: int):
+    j = models.TradeJournalEntry
+    return (j.user_id == user_id, j.is_finalized == True)
+
+
+def finalized_fingerprint(db: Session, user_id: int) -> tuple[int, int | None]:
+    j = models.TradeJournalEntry
+    count, last_id = db.execute(select(func.count(j.id), func.max(j.id)).where(*_finalized_filter(user_id))).one()
+    return int(count), last_id
+
+
+def _fetch_columns(db: Session, user_id: int, date_from: datetime | None, date_to: datetime | None):
+    j, sig = models.TradeJournalEntry, models.Signal
+    q = (
+        select(j.id, j.closed_at, j.pnl, sig.risk_amount)
+        .outerjoin(sig, sig.id == j.signal_id)
+        .where(*_finalized_filter(user_id))
+        .order_by(j.closed_at, j.id)
+    )
+    if date_from is not None:
+        q = q.where(j.closed_at >= as_utc_naive(date_from))
+    if date_to is not None:
+        q = q.where(j.closed_at < as_utc_naive(date_to))
+    rows = db.execute(q).all()
+    if not rows:
+        return [], [], np.zeros(0), np.zeros(0)
+    ids, closed_at, pnl, risk = zip(*rows)
+    pnl = np.array([p if p is not None else 0.0 for p in pnl], dtype=float)
+    risk = np.array([r if r is not None else np.nan for r in risk], dtype=float)
+    return list(ids), list(closed_at), pnl, risk
+
+
+def _round(a: np.ndarray) -> list[float]:
+    return np.round(a, 4).tolist()
+
+
+def _opt(x) -> float | None:
+    return None if x is None or not np.isfinite(x) else round(float(x), 4)
+
+
+def compute_analytics(ids: list[int], closed_at: list, pnl: np.ndarray, risk: np.ndarray, window: int) -> schemas.JournalAnalyticsOut:
+    n = len(pnl)
+    wins = pnl > 0
+    losses = pnl < 0
+
+    equity = np.cumsum(pnl)
+    # the starting balance (equity 0) counts as the first peak
+    peak = np.maximum.accumulate(np.maximum(equity, 0.0)) if n else equity
+    drawdown = peak - equity
+
+    # win rate over the last `window` trades (fewer at the start of the curve)
+    c = np.cumsum(wins, dtype=float)
+    lagged = np.concatenate([np.zeros(min(window, n)), c[:-window]]) if n else c
+    rolling = (c - lagged) / np.minimum(np.arange(1, n + 1), window)
+
+    gross_profit = float(pnl[wins].sum())
+    gross_loss = abs(float(pnl[losses].sum()))
+    n_wins, n_losses = int(wins.sum()), int(losses.sum())
+
+    # realized R = pnl / planned risk of the linked signal
+    has_risk = np.isfinite(risk) & (risk > 0)
+    r = pnl[has_risk] / risk[has_risk]
+    counts = np.bincount(np.searchsorted(R_EDGES, r, side="right"), minlength=len(R_EDGES) + 1)
+    bounds = [None, *R_EDGES.tolist(), None]
+
+    return schemas.JournalAnalyticsOut(
+        trades=n,
+        wins=n_wins,
+        losses=n_losses,
+        win_rate=_opt(n_wins / n) if n else None,
+        gross_profit=round(gross_profit, 4),
+        gross_loss=round(gross_loss, 4),
+        net_pnl=round(float(equity[-1]), 4) if n else 0.0,
+        profit_factor=_opt(gross_profit / gross_loss) if gross_loss > 0 else None,
+        avg_win=_opt(gross_profit / n_wins) if n_wins else None,
+        avg_loss=_opt(-gross_loss / n_losses) if n_losses else None,
+        expectancy=_opt(pnl.mean()) if n else None,
+        expectancy_r=_opt(r.mean()) if len(r) else None,
+        max_drawdown=round(float(drawdown.max()), 4) if n else 0.0,
+        rolling_window=window,
+        equity_curve=schemas.JournalEquityCurve(
+            journal_ids=ids,
+            closed_at=closed_at,
+            pnl=_round(pnl),
+            equity=_round(equity),
+            drawdown=_round(drawdown),
+            rolling_win_rate=_round(rolling),
+        ),
+        r_multiples=[
+            schemas.RMultipleBucket(lower=bounds[i], upper=bounds[i + 1], count=int(counts[i]))
+            for i in range(len(counts))
+        ],
+    )
+
+
+def journal_analytics(
+    db: Session,
+    user_id: int,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    window: int = 20,
+) -> schemas.JournalAnalyticsOut:
+    key = (user_id, finalized_fingerprint(db, user_id), as_utc_naive(date_from), as_utc_naive(date_to), window)
+    cached = journal_analytics_cache.get(key)
+    if cached is not None:
+        return cached
+    result = compute_analytics(*_fetch_columns(db, user_id, date_from, date_to), window=window)
+    journal_analytics_cache.put(key, result)
+    return result
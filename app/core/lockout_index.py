@@ -0,0 +1,97 @@
+"""Process-local index of today's DailyMetric state, keyed by (user_id, UTC day).
+
+build_plan reads the daily-loss lockout (and the daily counters) from here instead of
+querying daily_metrics on every plan. The index is:
+
+- rebuilt from the DB at startup and again on the first lookup after UTC midnight;
+- written through by every path that mutates today's DailyMetric (journal finalize,
+  /trading/metrics/reset-today, /admin/users/{id}/unlock-today) right after its commit;
+- filled lazily (one single-row read) for users not seen yet; "no row" is cached too.
+
+Consistency with several workers: each worker has its own index and write-through only
+updates the worker that handled the write. Entries therefore expire after
+LOCKOUT_INDEX_TTL_SECONDS and are re-read from the DB, which bounds how long another worker
+can serve a stale lockout in a plan preview. /engine/commit does not trust the index: it
+reads today's row in its own context query and writes the result back here, so a trade is
+never committed past a lockout another worker has set. With a single worker the TTL can
+be set to 0 (never expire) and the index is exact.
+"""
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app import models
+
+
+def utc_day_str() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+
+@dataclass(frozen=True)
+class DailyState:
+    locked_out: bool = False
+    realized_pnl: float = 0.0
+    trades_today: int = 0
+    consecutive_losses: int = 0
+
+    @classmethod
+    def from_metric(cls, dm: models.DailyMetric | None) -> "DailyState":
+        if dm is None:
+            return cls()
+        return cls(
+            locked_out=bool(dm.locked_out),
+            realized_pnl=float(dm.realized_pnl or 0.0),
+            trades_today=int(dm.trades_today or 0),
+            consecutive_losses=int(dm.consecutive_losses or 0),
+        )
+
+
+class LockoutIndex:
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._day: str | None = None
+        self._entries: dict[tuple[int, str], tuple[float, DailyState]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def rebuild(self, db: Session, day: str | None = None):
+        day = day or utc_day_str()
+        rows = db.query(models.DailyMetric).filter(models.DailyMetric.day == day).all()
+        now = time.monotonic()
+        entries = {(dm.user_id, day): (now, DailyState.from_metric(dm)) for dm in rows}
+        with self._lock:
+            self._day = day
+            self._entries = entries
+
+    def get(self, db: Session, user_id: int) -> DailyState:
+        day = utc_day_str()
+        if day != self._day:
+            self.rebuild(db, day)
+        key = (user_id, day)
+        with self._lock:
+            item = self._entries.get(key)
+        if item is not None and (not self.ttl_seconds or time.monotonic() - item[0] < self.ttl_seconds):
+            self.hits += 1
+            return item[1]
+        self.misses += 1
+        dm = db.query(models.DailyMetric).filter(models.DailyMetric.user_id == user_id, models.DailyMetric.day == day).first()
+        state = DailyState.from_metric(dm)
+        self.put(user_id, day, state)
+        return state
+
+    def put(self, user_id: int, day: str, state: DailyState):
+        """Write-through: call after committing a change to (user_id, day)'s DailyMetric."""
+        with self._lock:
+            if day == self._day:
+                self._entries[(user_id, day)] = (time.monotonic(), state)
+
+    def stats(self) -> dict:
+        return {"day": self._day, "entries": len(self._entries), "ttl_seconds": self.ttl_seconds, "hits": self.hits, "misses": self.misses}
+
+
+lockout_index = LockoutIndex(ttl_seconds=settings.LOCKOUT_INDEX_TTL_SECONDS)
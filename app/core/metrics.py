@@ -0,0 +1,93 @@
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from app.core.query_counter import count_queries
+
+# Upper bounds in milliseconds; the last bucket is +Inf.
+LATENCY_BUCKETS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 25)
+
+
+class Histogram:
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        i = 0
+        while i < len(self.buckets) and value > self.buckets[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 4),
+            "avg": round(self.sum / self.count, 4) if self.count else None,
+            "max": round(self.max, 4),
+            "buckets": {**{f"le_{b}": c for b, c in zip(self.buckets, self.counts)}, "le_inf": self.counts[-1]},
+        }
+
+
+class GateMetrics:
+    """Process-wide latency (ms) and DB statement histograms per gate name, e.g. "plan.rr"."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latency: dict[str, Histogram] = {}
+        self._statements: dict[str, Histogram] = {}
+
+    def observe(self, name: str, ms: float, statements: int):
+        with self._lock:
+            if name not in self._latency:
+                self._latency[name] = Histogram(LATENCY_BUCKETS_MS)
+                self._statements[name] = Histogram(STATEMENT_BUCKETS)
+            self._latency[name].observe(ms)
+            self._statements[name].observe(statements)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                name: {"latency_ms": self._latency[name].snapshot(), "statements": self._statements[name].snapshot()}
+                for name in sorted(self._latency)
+            }
+
+    def reset(self):
+        with self._lock:
+            self._latency.clear()
+            self._statements.clear()
+
+
+gate_metrics = GateMetrics()
+
+
+class GateTimer:
+    """Times the gates of one request; feeds gate_metrics and renders a Server-Timing header."""
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self._ms: dict[str, float] = defaultdict(float)
+
+    @contextmanager
+    def gate(self, name: str):
+        start = time.perf_counter()
+        with count_queries() as qc:
+            try:
+                yield
+            finally:
+                ms = (time.perf_counter() - start) * 1000.0
+                self._ms[name] += ms
+                gate_metrics.observe(f"{self.prefix}.{name}", ms, qc.count)
+
+    def server_timing(self) -> str:
+        # per-gate totals for the request (summed across candidates for batches)
+        return ", ".join(f"{self.prefix}-{name};dur={ms:.3f}" for name, ms in self._ms.items())
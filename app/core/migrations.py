@@ -1,5 +1,9 @@
+import logging
+
 from sqlalchemy import text
-from app.database import engine
+from app.database import Base, engine
+
+logger = logging.getLogger(__name__)
 
 def _has_column(table: str, col: str) -> bool:
     with engine.connect() as conn:
@@ -16,9 +20,66 @@ def add_column_if_missing(table: str, col: str, ddl_type: str, default_sql: str
     with engine.begin() as conn:
         conn.execute(text(ddl))
 
+def _has_index(name: str) -> bool:
+    with engine.connect() as conn:
+        row = conn.execute(text("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = :n"), {"n": name}).first()
+    return row is not None
+
+def dedupe_daily_metrics():
+    # ux_daily_metrics_user_id_day needs one row per (user_id, day); older code could race two in.
+    # Duplicates are folded into the oldest row: pnl and counters are summed (the streak too, which
+    # errs on the protective side), a lockout on any of them is kept.
+    if _has_index("ux_daily_metrics_user_id_day"):
+        return
+    group = "FROM daily_metrics d WHERE d.user_id = daily_metrics.user_id AND d.day = daily_metrics.day"
+    with engine.begin() as conn:
+        merged = conn.execute(text(
+            "UPDATE daily_metrics SET "
+            f"realized_pnl = (SELECT SUM(COALESCE(d.realized_pnl, 0)) {group}), "
+            f"trades_today = (SELECT SUM(COALESCE(d.trades_today, 0)) {group}), "
+            f"consecutive_losses = (SELECT SUM(COALESCE(d.consecutive_losses, 0)) {group}), "
+            f"locked_out = (SELECT MAX(COALESCE(d.locked_out, 0)) {group}), "
+            f"created_at = (SELECT MIN(d.created_at) {group}), "
+            f"updated_at = (SELECT MAX(d.updated_at) {group}) "
+            "WHERE id IN (SELECT MIN(id) FROM daily_metrics GROUP BY user_id, day HAVING COUNT(*) > 1)"
+        )).rowcount
+        dropped = conn.execute(text(
+            "DELETE FROM daily_metrics WHERE id NOT IN "
+            "(SELECT MIN(id) FROM daily_metrics GROUP BY user_id, day)"
+        )).rowcount
+    if merged:
+        logger.warning("daily_metrics: merged %s duplicate rows into %s (user_id, day) rows", dropped, merged)
+
+def dedupe_symbol_specs():
+    # ux_symbol_specs_market_symbol needs one spec per instrument; the most recently edited row
+    # wins (updated_at, else created_at, then the highest id). Dropped rows are logged in full so
+    # an operator can restore one if it was the right spec.
+    if _has_index("ux_symbol_specs_market_symbol"):
+        return
+    ranked = (
+        "SELECT id FROM (SELECT id, ROW_NUMBER() OVER (PARTITION BY market, symbol "
+        "ORDER BY COALESCE(updated_at, created_at) DESC, id DESC) AS rn FROM symbol_specs) WHERE rn > 1"
+    )
+    with engine.begin() as conn:
+        dropped = conn.execute(text(f"SELECT * FROM symbol_specs WHERE id IN ({ranked}) ORDER BY market, symbol, id")).mappings().all()
+        for row in dropped:
+            logger.warning("symbol_specs: dropping duplicate spec %s", dict(row))
+        conn.execute(text(f"DELETE FROM symbol_specs WHERE id IN ({ranked})"))
+
+def create_missing_indexes():
+    # create_all() skips indexes on tables that already exist; add any declared since
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
 def run_sqlite_migrations():
     # trade_journal_entries new columns (Phase 4.4)
     add_column_if_missing("trade_journal_entries", "is_finalized", "BOOLEAN", "0")
     add_column_if_missing("trade_journal_entries", "closed_at", "DATETIME")
     add_column_if_missing("trade_journal_entries", "pnl_calc_mode", "VARCHAR")
     add_column_if_missing("trade_journal_entries", "used_risk_profile_id", "INTEGER")
+    add_column_if_missing("trade_journal_entries", "position_size_units", "FLOAT")
+    add_column_if_missing("symbol_specs", "updated_at", "DATETIME")
+    dedupe_daily_metrics()
+    dedupe_symbol_specs()
+    create_missing_indexes()
@@ -0,0 +1,50 @@
+import base64
+import json
+from datetime import datetime, timezone
+
+from fastapi import HTTPException
+
+
+def encode_cursor(*values) -> str:
+    """Opaque keyset cursor: the sort key of the last row returned."""
+    raw = json.dumps(list(values), separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int = 1) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def decode_id_cursor(cursor: str | None) -> int | None:
+    """The last id of a keyset page over id desc (None = first page)."""
+    if not cursor:
+        return None
+    try:
+        return int(decode_cursor(cursor)[0])
+    except (TypeError, ValueError, IndexError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def as_utc_naive(dt: datetime | None) -> datetime | None:
+    # DateTime columns are stored as naive UTC in SQLite; normalize filter bounds the same way
+    if dt is None or dt.tzinfo is None:
+        return dt
+    return dt.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def keyset_page(query, model, limit: int, cursor: str | None, out_schema) -> tuple[list, str | None]:
+    """One page of `query` ordered by model.id desc; the cursor is the last id returned."""
+    before_id = decode_id_cursor(cursor)
+    if before_id is not None:
+        query = query.filter(model.id < before_id)
+    rows = query.order_by(model.id.desc()).limit(limit + 1).all()
+    items = [out_schema.model_validate(r) for r in rows[:limit]]
+    next_cursor = encode_cursor(rows[limit - 1].id) if len(rows) > limit else None
+    return items, next_cursor
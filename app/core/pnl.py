@@ -0,0 +1,63 @@
+"""PnL of a closed trade from entry/exit, position size and the instrument's SymbolSpec.
+
+compute_pnl_hybrid handles one trade (finalize, import); compute_pnl_hybrid_vec applies the same
+rules to column arrays of trades on one instrument (PnL backfill).
+"""
+import numpy as np
+
+from app.core.symbol_specs import SymbolSpecSnapshot
+
+
+def compute_pnl_hybrid(
+    direction: str,
+    entry: float,
+    exit: float,
+    units: float | None,
+    spec: SymbolSpecSnapshot | None,
+):
+    # returns (pnl, mode)
+    if units is None:
+        units = 0.0
+
+    # Try spec-based
+    if spec:
+        # Forex: use pips * pip_value_per_lot * lots
+        if spec.pip_size and spec.pip_value and spec.contract_size and spec.contract_size > 0:
+            lots = units / spec.contract_size
+            pips = (exit - entry) / spec.pip_size if direction == "long" else (entry - exit) / spec.pip_size
+            pnl = pips * spec.pip_value * lots
+            return float(pnl), "spec"
+
+        # Futures-like: ticks * tick_value * contracts
+        if spec.tick_size and spec.tick_value and spec.tick_size > 0:
+            ticks = (exit - entry) / spec.tick_size if direction == "long" else (entry - exit) / spec.tick_size
+            pnl = ticks * spec.tick_value * units
+            return float(pnl), "spec"
+
+        # Generic point value: points * point_value * units
+        if spec.point_value:
+            points = (exit - entry) if direction == "long" else (entry - exit)
+            pnl = points * spec.point_value * units
+            return float(pnl), "spec"
+
+    # Fallback: points * units
+    points = (exit - entry) if direction == "long" else (entry - exit)
+    pnl = points * units
+    return float(pnl), "fallback"
+
+
+def compute_pnl_hybrid_vec(is_long, entry, exit, units, spec: SymbolSpecSnapshot | None):
+    """Vectorized compute_pnl_hybrid for trades sharing one spec; returns (pnl array, mode)."""
+    entry, exit = np.asarray(entry, dtype=float), np.asarray(exit, dtype=float)
+    units = np.nan_to_num(np.asarray(units, dtype=float))  # missing size counts as 0, as above
+    points = np.where(np.asarray(is_long, dtype=bool), exit - entry, entry - exit)
+
+    if spec:
+        if spec.pip_size and spec.pip_value and spec.contract_size and spec.contract_size > 0:
+            return points / spec.pip_size * spec.pip_value * (units / spec.contract_size), "spec"
+        if spec.tick_size and spec.tick_value and spec.tick_size > 0:
+            return points / spec.tick_size * spec.tick_value * units, "spec"
+        if spec.point_value:
+            return points * spec.point_value * units, "spec"
+
+    return points * units, "fallback"
@@ -0,0 +1,176 @@
+"""Re-price finalized journal entries after a SymbolSpec correction.
+
+Entries whose pnl was derived from prices (pnl_calc_mode "spec" or "fallback") are recomputed
+with compute_pnl_hybrid_vec against the current specs; manual pnls are never touched. The size
+is the entry's own position_size_units (imported trades), else its signal's; entries with no
+persisted size are skipped rather than re-priced as 0 units. The job
+walks trade_journal_entries by id, fetching plain column tuples (no ORM objects) one chunk at a
+time, and commits each chunk's corrections in its own transaction. Afterwards the affected
+DailyMetric days and the affected users' strategy_stats are rebuilt.
+
+Today's DailyMetric is skipped unless include_today is set: rebuilding it from the journal would
+undo a /trading/metrics/reset-today made earlier in the day. Skipped rows are counted in
+days_skipped.
+
+    python -m app.core.pnl_backfill [--market forex --symbol EURUSD] [--chunk-rows N] [--dry-run] [--include-today]
+"""
+import argparse
+from dataclasses import asdict, dataclass
+
+import numpy as np
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.daily_metrics import daily_loss_limit, rebuild_daily_metric
+from app.core.journal_analytics import journal_analytics_cache
+from app.core.lockout_index import lockout_index, utc_day_str
+from app.core.plan_cache import plan_cache
+from app.core.pnl import compute_pnl_hybrid_vec
+from app.core.strategy_stats import rebuild_strategy_stats
+from app.core.symbol_specs import symbol_spec_registry
+from app import models
+
+PRICE_DERIVED_MODES = ("spec", "fallback")
+
+
+@dataclass
+class BackfillResult:
+    scanned: int = 0
+    updated: int = 0
+    days_rebuilt: int = 0
+    days_skipped: int = 0
+    users: int = 0
+
+
+def _default_loss_limits(db: Session, user_ids: set[int]) -> dict[int, float | None]:
+    # same choice as get_default_risk_profile: the default profile, else the oldest one
+    chosen: dict[int, models.RiskProfile] = {}
+    for rp in db.query(models.RiskProfile).filter(models.RiskProfile.user_id.in_(user_ids)).order_by(models.RiskProfile.id).all():
+        cur = chosen.get(rp.user_id)
+        if cur is None or (rp.is_default and not cur.is_default):
+            chosen[rp.user_id] = rp
+    return {uid: daily_loss_limit(chosen.get(uid)) for uid in user_ids}
+
+
+def _reprice_chunk(db: Session, rows: list) -> tuple[list[dict], set[tuple[int, str]]]:
+    """Corrections ({id, pnl, pnl_calc_mode}) for one chunk, and the (user_id, day)s they touch."""
+    ids, user_ids, markets, symbols, directions, entry, exit_, units, old_pnl, old_mode, closed_at = (
+        np.array(col, dtype=object) for col in zip(*rows)
+    )
+    entry, exit_, units = entry.astype(float), exit_.astype(float), units.astype(float)
+    old_pnl = np.array([np.nan if p is None else p for p in old_pnl], dtype=float)
+
+    updates, days = [], set()
+    for market, symbol in set(zip(markets.tolist(), symbols.tolist())):
+        mask = (markets == market) & (symbols == symbol)
+        pnl, mode = compute_pnl_hybrid_vec(
+            directions[mask] == "long", entry[mask], exit_[mask], units[mask], symbol_spec_registry.get(db, market, symbol)
+        )
+        pnl = np.round(pnl, 2)
+        changed = ~np.isclose(pnl, old_pnl[mask], rtol=0.0, atol=1e-9) | (old_mode[mask] != mode)
+        for i in np.flatnonzero(changed):
+            row_id, uid, closed = ids[mask][i], user_ids[mask][i], closed_at[mask][i]
+            updates.append({"id": int(row_id), "pnl": float(pnl[i]), "pnl_calc_mode": mode})
+            if closed is not None:
+                days.add((int(uid), closed.strftime("%Y-%m-%d")))
+    return updates, days
+
+
+def recompute_pnl(
+    db: Session,
+    market: str | None = None,
+    symbol: str | None = None,
+    chunk_rows: int | None = None,
+    dry_run: bool = False,
+    include_today: bool = False,
+) -> BackfillResult:
+    chunk_rows = chunk_rows or settings.PNL_BACKFILL_CHUNK_ROWS
+    symbol_spec_registry.reload(db)  # price with the spec as committed, not a stale snapshot
+
+    j, sig = models.TradeJournalEntry, models.Signal
+    units = func.coalesce(j.position_size_units, sig.position_size_units)
+    q = (
+        select(
+            j.id, j.user_id, j.market, j.symbol, j.direction, j.entry_price, j.exit_price,
+            units, j.pnl, j.pnl_calc_mode, j.closed_at,
+        )
+        .outerjoin(sig, sig.id == j.signal_id)
+        .where(
+            j.is_finalized == True,
+            j.pnl_calc_mode.in_(PRICE_DERIVED_MODES),
+            j.entry_price.isnot(None),
+            j.exit_price.isnot(None),
+            units.isnot(None),
+        )
+    )
+    if market is not None:
+        q = q.where(j.market == market)
+    if symbol is not None:
+        q = q.where(j.symbol == symbol)
+
+    result = BackfillResult()
+    affected: set[tuple[int, str]] = set()
+    last_id = 0
+    while True:
+        rows = db.execute(q.where(j.id > last_id).order_by(j.id).limit(chunk_rows)).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        result.scanned += len(rows)
+        updates, days = _reprice_chunk(db, rows)
+        result.updated += len(updates)
+        affected |= days
+        if updates and not dry_run:
+            db.execute(update(j), updates)  # executemany UPDATE ... WHERE id = ?
+            db.commit()
+
+    users = {uid for uid, _ in affected}
+    today, today_states = utc_day_str(), {}
+    days = sorted(key for key in affected if include_today or key[1] != today)
+    result.users = len(users)
+    result.days_rebuilt = len(days)
+    result.days_skipped = len(affected) - len(days)
+    if dry_run or not affected:
+        return result
+
+    limits = _default_loss_limits(db, users)
+    for n, (uid, day) in enumerate(days, 1):
+        state = rebuild_daily_metric(db, uid, day, limits.get(uid))
+        if day == today:
+            today_states[uid] = state
+        if n % chunk_rows == 0:
+            db.commit()
+    db.commit()
+    for uid in users:
+        rebuild_strategy_stats(db, uid)
+
+    for uid in users:
+        if uid in today_states:
+            lockout_index.put(uid, today, today_states[uid])
+        plan_cache.bump(uid)
+        journal_analytics_cache.invalidate(uid)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute price-derived PnL of finalized journal entries.")
+    parser.add_argument("--market", default=None)
+    parser.add_argument("--symbol", default=None)
+    parser.add_argument("--chunk-rows", type=int, default=None)
+    parser.add_argument("--dry-run", action="store_true", help="count corrections without writing them")
+    parser.add_argument("--include-today", action="store_true", help="also rebuild today's daily metrics (undoes a reset-today)")
+    args = parser.parse_args()
+
+    from app.database import Base, SessionLocal, engine
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        print(asdict(recompute_pnl(db, args.market, args.symbol, args.chunk_rows, args.dry_run, args.include_today)))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
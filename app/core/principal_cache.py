@@ -0,0 +1,119 @@
+"""Process-local LRU + TTL cache of authenticated principals, keyed by token subject.
+
+get_current_user serves an immutable Principal snapshot from here instead of loading the
+User (and lazily its Role) on every request. /admin/users/{id}/role and /active invalidate
+the user's entry right after their commit. With several workers the invalidation only
+reaches the worker that handled it; other workers pick the change up when the entry expires
+after PRINCIPAL_CACHE_TTL_SECONDS.
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+
+from app.core.config import settings
+from app import models
+
+
+@dataclass(frozen=True)
+class RoleRef:
+    name: str
+
+
+@dataclass(frozen=True)
+class Principal:
+    """What endpoints read from the current user. `role.name` mirrors models.User.role."""
+    id: int
+    email: str
+    is_active: bool
+    is_admin: bool
+    role: RoleRef | None = None
+    created_at: datetime | None = None
+
+    @classmethod
+    def from_user(cls, user: models.User) -> "Principal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            is_active=bool(user.is_active),
+            is_admin=bool(user.is_admin),
+            role=RoleRef(user.role.name) if user.role is not None else None,
+            created_at=user.created_at,
+        )
+
+    @classmethod
+    def from_claims(cls, claims: dict) -> "Principal":
+        """From a stateless access token (app.core.security.principal_claims)."""
+        return cls(
+            id=int(claims["sub"]),
+            email=claims["email"],
+            is_active=bool(claims["active"]),
+            is_admin=bool(claims["adm"]),
+            role=RoleRef(claims["role"]) if claims.get("role") else None,
+        )
+
+
+class PrincipalCache:
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, Principal]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, subject: str) -> Principal | None:
+        now = time.monotonic()
+        with self._lock:
+            item = self._entries.get(subject)
+            if item is None:
+                self.misses += 1
+                return None
+            expires_at, principal = item
+            if expires_at <= now:
+                del self._entries[subject]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(subject)
+            self.hits += 1
+            return principal
+
+    def put(self, subject: str, principal: Principal):
+        with self._lock:
+            self._entries[subject] = (time.monotonic() + self.ttl_seconds, principal)
+            self._entries.move_to_end(subject)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            if self._entries.pop(str(user_id), None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+
+principal_cache = PrincipalCache(
+    max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,39 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+from app.database import engine
+
+# Every active counter in the current context sees each statement, so counters nest
+# (e.g. a whole plan and one of its gates can be measured at the same time).
+_active: ContextVar[tuple["QueryCount", ...]] = ContextVar("active_query_counters", default=())
+
+
+class QueryCount:
+    def __init__(self):
+        self.count = 0
+        self.statements: list[str] = []
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    for counter in _active.get():
+        counter.count += 1
+        counter.statements.append(statement)
+
+
+@contextmanager
+def count_queries():
+    """Count SQL statements sent to the DB inside the block.
+
+        with count_queries() as qc:
+            build_plan(payload, db, user)
+        assert qc.count == 1
+    """
+    counter = QueryCount()
+    token = _active.set(_active.get() + (counter,))
+    try:
+        yield counter
+    finally:
+        _active.reset(token)
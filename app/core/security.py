@@ -1,3 +1,4 @@
+import uuid
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
@@ -5,13 +6,21 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 
 from app.core.config import settings
+from app.core.principal_cache import Principal, principal_cache
+from app.core.token_denylist import mark_refresh_used, token_denylist
 from app.database import get_db
 from app import models
 
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    argon2__rounds=settings.ARGON2_TIME_COST,
+    argon2__memory_cost=settings.ARGON2_MEMORY_COST_KIB,
+    argon2__parallelism=settings.ARGON2_PARALLELISM,
+)
 
 # Must match your login endpoint
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
@@ -25,42 +34,133 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
-def create_access_token(subject: str, expires_minutes: Optional[int] = None) -> str:
-    expire = datetime.now(timezone.utc) + timedelta(
+def create_access_token(subject: str, expires_minutes: Optional[int] = None, claims: Optional[dict] = None) -> str:
+    now = datetime.now(timezone.utc)
+    expire = now + timedelta(
         minutes=expires_minutes or settings.ACCESS_TOKEN_EXPIRE_MINUTES
     )
-    to_encode = {"sub": subject, "exp": expire}
+    # iat keeps sub-second precision so a token issued right after a revocation is not denied
+    to_encode = {"sub": subject, "iat": now.timestamp(), "exp": expire, **(claims or {})}
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
 
-def decode_access_token(token: str) -> str:
+def create_refresh_token(subject: str) -> str:
+    now = datetime.now(timezone.utc)
+    expire = now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    to_encode = {"sub": subject, "iat": now.timestamp(), "exp": expire, "typ": "refresh", "jti": uuid.uuid4().hex}
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+def principal_claims(user: models.User) -> dict:
+    """Claims get_current_user authorizes from in stateless mode (see Principal.from_claims)."""
+    return {
+        "typ": "access",
+        "email": user.email,
+        "role": user.role.name if user.role is not None else None,
+        "active": bool(user.is_active),
+        "adm": bool(user.is_admin),
+    }
+
+
+def issue_tokens(user: models.User) -> dict:
+    """Token response for login/refresh; `user.role` must be loaded."""
+    if not settings.AUTH_STATELESS:
+        return {"access_token": create_access_token(str(user.id)), "token_type": "bearer"}
+    return {
+        "access_token": create_access_token(
+            str(user.id), settings.STATELESS_ACCESS_TOKEN_EXPIRE_MINUTES, principal_claims(user)
+        ),
+        "refresh_token": create_refresh_token(str(user.id)),
+        "token_type": "bearer",
+    }
+
+
+def decode_token(token: str) -> dict:
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        sub = payload.get("sub")
-        if not sub:
-            raise HTTPException(status_code=401, detail="Token missing subject.")
-        return str(sub)
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired token.",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if not payload.get("sub"):
+        raise HTTPException(status_code=401, detail="Token missing subject.")
+    return payload
+
+
+def decode_access_token(token: str) -> str:
+    return str(decode_token(token)["sub"])
+
+
+def _revoked(db: Session, payload: dict) -> bool:
+    return token_denylist.is_revoked(db, int(payload["sub"]), float(payload.get("iat") or 0.0))
 
 
 def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db),
-) -> models.User:
-    user_id = decode_access_token(token)
+) -> Principal:
+    payload = decode_token(token)
+    if payload.get("typ") == "refresh":
+        raise HTTPException(status_code=401, detail="Refresh tokens cannot be used for API access.")
+    user_id = str(payload["sub"])
+
+    if settings.AUTH_STATELESS and payload.get("typ") == "access":
+        # role/active come from the token; revocations from the in-memory deny-list
+        if _revoked(db, payload):
+            raise HTTPException(status_code=401, detail="Token revoked.", headers={"WWW-Authenticate": "Bearer"})
+        principal = Principal.from_claims(payload)
+    else:
+        principal = principal_cache.get(user_id)
+        if principal is None:
+            user = (
+                db.query(models.User)
+                .options(joinedload(models.User.role))
+                .filter(models.User.id == int(user_id))
+                .first()
+            )
+            if not user:
+                raise HTTPException(status_code=401, detail="User not found.")
+            principal = Principal.from_user(user)
+            principal_cache.put(user_id, principal)
+    if not principal.is_active:
+        raise HTTPException(status_code=403, detail="User is inactive.")
+    return principal
+
 
-    user = db.query(models.User).filter(models.User.id == int(user_id)).first()
+def refresh_user(db: Session, refresh_token: str) -> models.User:
+    """Validate a refresh token, spend it, and reload its user (role included) from the DB.
+
+    Each refresh token is exchanged once. A second use means the token leaked, so every token
+    of the user is revoked.
+    """
+    payload = decode_token(refresh_token)
+    if payload.get("typ") != "refresh" or not payload.get("jti"):
+        raise HTTPException(status_code=401, detail="Not a refresh token.")
+    if _revoked(db, payload):
+        raise HTTPException(status_code=401, detail="Token revoked.", headers={"WWW-Authenticate": "Bearer"})
+    user = (
+        db.query(models.User)
+        .options(joinedload(models.User.role))
+        .filter(models.User.id == int(payload["sub"]))
+        .first()
+    )
     if not user:
         raise HTTPException(status_code=401, detail="User not found.")
     if not user.is_active:
         raise HTTPException(status_code=403, detail="User is inactive.")
+
+    expires_at = datetime.fromtimestamp(payload["exp"], timezone.utc).replace(tzinfo=None)
+    if not mark_refresh_used(db, user.id, payload["jti"], expires_at):
+        revoked_at = token_denylist.revoke(db, user.id, "refresh_reuse")
+        db.commit()
+        token_denylist.put(user.id, revoked_at)
+        raise HTTPException(status_code=401, detail="Refresh token already used.", headers={"WWW-Authenticate": "Bearer"})
     return user
-def require_admin(current_user: models.User = Depends(get_current_user)) -> models.User:
+
+
+def require_admin(current_user: Principal = Depends(get_current_user)) -> Principal:
     if not current_user.role or current_user.role.name != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
     return current_user
\ No newline at end of file
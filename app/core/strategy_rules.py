@@ -0,0 +1,181 @@
+"""Compile StrategyTemplate.rules_json into predicates evaluated by build_plan.
+
+Supported keys (all optional):
+
+    {
+      "sessions": ["07:00-10:00", "22:00-02:00"],   UTC windows the plan must fall in
+      "min_rr": 2.0,                                 minimum RR (on top of the request's rr_min)
+      "allowed_symbols": ["EURUSD", "GBPUSD"],
+      "allowed_timeframes": ["15m", "1h"],
+      "max_stop_distance": 0.005                     max |entry - stop_loss|, in price units
+    }
+
+Rules are parsed once per (strategy_id, updated_at) and cached in-process; evaluation is
+a handful of comparisons with no JSON work per request.
+"""
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, time
+from typing import Callable
+
+from app import models, schemas
+
+KNOWN_KEYS = {"sessions", "min_rr", "allowed_symbols", "allowed_timeframes", "max_stop_distance"}
+_CACHE_MAX = 1024
+
+
+class RulesError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class RuleInput:
+    payload: schemas.EnginePlanRequest
+    now: time
+    rr: float | None
+    stop_distance: float | None
+
+
+Rule = Callable[[RuleInput], schemas.EngineChecklistItem]
+
+
+@dataclass(frozen=True)
+class CompiledRules:
+    rules: tuple[Rule, ...] = ()
+    error: str | None = None
+    time_dependent: bool = False  # result depends on the clock (session windows)
+
+    def evaluate(self, inp: RuleInput) -> list[schemas.EngineChecklistItem]:
+        if self.error:
+            return [schemas.EngineChecklistItem(key="strategy_rules", passed=False, detail=f"invalid rules_json: {self.error}")]
+        return [rule(inp) for rule in self.rules]
+
+
+def _parse_hhmm(s: str) -> time:
+    try:
+        return datetime.strptime(s.strip(), "%H:%M").time()
+    except ValueError:
+        raise RulesError(f"bad time {s!r} (expected HH:MM)")
+
+
+def _session_rule(windows: list) -> Rule:
+    spans: list[tuple[time, time]] = []
+    for w in windows:
+        if not isinstance(w, str) or "-" not in w:
+            raise RulesError(f"bad session {w!r} (expected 'HH:MM-HH:MM')")
+        start, end = w.split("-", 1)
+        spans.append((_parse_hhmm(start), _parse_hhmm(end)))
+    label = ", ".join(windows)
+
+    def in_window(t: time) -> bool:
+        for start, end in spans:
+            if start <= end and start <= t < end:
+                return True
+            if start > end and (t >= start or t < end):  # wraps midnight
+                return True
+        return False
+
+    def rule(inp: RuleInput):
+        ok = in_window(inp.now)
+        return schemas.EngineChecklistItem(
+            key="rule_session", passed=ok,
+            detail=f"{inp.now.strftime('%H:%M')} UTC {'inside' if ok else 'outside'} sessions ({label})",
+        )
+    return rule
+
+
+def _min_rr_rule(min_rr) -> Rule:
+    if not isinstance(min_rr, (int, float)):
+        raise RulesError("min_rr must be a number")
+    min_rr = float(min_rr)
+
+    def rule(inp: RuleInput):
+        if inp.rr is None:
+            return schemas.EngineChecklistItem(key="rule_min_rr", passed=True, detail="TP not provided; strategy RR rule skipped")
+        ok = inp.rr >= min_rr
+        return schemas.EngineChecklistItem(key="rule_min_rr", passed=ok, detail=f"RR={inp.rr} (strategy min {min_rr})")
+    return rule
+
+
+def _allowed_rule(key: str, attr: str, values) -> Rule:
+    if not isinstance(values, list) or not all(isinstance(v, str) for v in values):
+        raise RulesError(f"{key} must be a list of strings")
+    allowed = frozenset(v.upper() for v in values)
+
+    def rule(inp: RuleInput):
+        value = getattr(inp.payload, attr)
+        ok = value.upper() in allowed
+        return schemas.EngineChecklistItem(
+            key=f"rule_{attr}", passed=ok,
+            detail=f"{attr} {value} {'allowed' if ok else 'not allowed'} by strategy",
+        )
+    return rule
+
+
+def _max_stop_rule(max_dist) -> Rule:
+    if not isinstance(max_dist, (int, float)) or max_dist <= 0:
+        raise RulesError("max_stop_distance must be a positive number")
+    max_dist = float(max_dist)
+
+    def rule(inp: RuleInput):
+        if inp.stop_distance is None:
+            return schemas.EngineChecklistItem(key="rule_max_stop_distance", passed=True, detail="no stop distance; rule skipped")
+        ok = inp.stop_distance <= max_dist
+        return schemas.EngineChecklistItem(
+            key="rule_max_stop_distance", passed=ok,
+            detail=f"stop distance {round(inp.stop_distance, 6)} (strategy max {max_dist})",
+        )
+    return rule
+
+
+def compile_rules(rules_json: str | None) -> CompiledRules:
+    """Parse and validate rules_json; raises RulesError on invalid input."""
+    if not rules_json or not rules_json.strip():
+        return CompiledRules()
+    try:
+        spec = json.loads(rules_json)
+    except json.JSONDecodeError as e:
+        raise RulesError(f"not valid JSON ({e.msg})")
+    if not isinstance(spec, dict):
+        raise RulesError("rules_json must be a JSON object")
+    unknown = set(spec) - KNOWN_KEYS
+    if unknown:
+        raise RulesError(f"unknown keys: {', '.join(sorted(unknown))}")
+
+    rules: list[Rule] = []
+    if spec.get("sessions"):
+        rules.append(_session_rule(spec["sessions"]))
+    if spec.get("min_rr") is not None:
+        rules.append(_min_rr_rule(spec["min_rr"]))
+    if spec.get("allowed_symbols"):
+        rules.append(_allowed_rule("allowed_symbols", "symbol", spec["allowed_symbols"]))
+    if spec.get("allowed_timeframes"):
+        rules.append(_allowed_rule("allowed_timeframes", "timeframe", spec["allowed_timeframes"]))
+    if spec.get("max_stop_distance") is not None:
+        rules.append(_max_stop_rule(spec["max_stop_distance"]))
+    return CompiledRules(rules=tuple(rules), time_dependent=bool(spec.get("sessions")))
+
+
+_compiled: OrderedDict[tuple, CompiledRules] = OrderedDict()
+_lock = threading.Lock()
+
+
+def get_compiled_rules(st: models.StrategyTemplate) -> CompiledRules:
+    """Compiled rules for a strategy, cached by (id, updated_at) so edits recompile."""
+    key = (st.id, st.updated_at)
+    with _lock:
+        compiled = _compiled.get(key)
+        if compiled is not None:
+            _compiled.move_to_end(key)
+            return compiled
+    try:
+        compiled = compile_rules(st.rules_json)
+    except RulesError as e:
+        compiled = CompiledRules(error=str(e))
+    with _lock:
+        _compiled[key] = compiled
+        while len(_compiled) > _CACHE_MAX:
+            _compiled.popitem(last=False)
+    return compiled
@@ -0,0 +1,143 @@
+"""Incremental per-(user, strategy) performance rollups (strategy_stats).
+
+Finalizing journal entries whose signal has a strategy calls apply_strategy_results(), one
+upsert per strategy. rebuild_strategy_stats() recomputes the table from finalized entries for
+repair:
+
+    python -m app.core.strategy_stats --rebuild [--user-id N]
+"""
+import argparse
+from datetime import datetime
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app import models
+
+
+def apply_strategy_results(db: Session, user_id: int, strategy_id: int, results: list[tuple[float, float | None]]):
+    """Fold closed trades (pnl, rr), in close order, into their strategy rollup with ONE upsert.
+
+    The drawdown of the whole sequence is reduced to three numbers computed here: its total,
+    its lowest and highest running sum, and the deepest drawdown inside the sequence. The peak
+    and max drawdown are then updated in SQL against the stored equity.
+    """
+    s = models.StrategyStat.__table__.c
+    pnls = [float(p) for p, _ in results]
+    rrs = [float(rr) for _, rr in results if rr is not None]
+    total = sum(pnls)
+    wins, losses = sum(p > 0 for p in pnls), sum(p < 0 for p in pnls)
+    profit, lost = sum(p for p in pnls if p > 0), -sum(p for p in pnls if p < 0)
+
+    run, run_min, run_max, inner_dd = 0.0, 0.0, 0.0, 0.0
+    for p in pnls:
+        run += p
+        run_min, run_max = min(run_min, run), max(run_max, run)
+        inner_dd = max(inner_dd, run_max - run)
+
+    now = datetime.utcnow()
+    stmt = (
+        sqlite_insert(models.StrategyStat)
+        .values(
+            user_id=user_id,
+            strategy_id=strategy_id,
+            trades=len(pnls),
+            wins=wins,
+            losses=losses,
+            gross_pnl=total,
+            gross_profit=profit,
+            gross_loss=lost,
+            rr_sum=sum(rrs),
+            rr_count=len(rrs),
+            equity=total,
+            equity_peak=run_max,
+            max_drawdown=inner_dd,
+            updated_at=now,
+        )
+        .on_conflict_do_update(
+            index_elements=["user_id", "strategy_id"],
+            set_={
+                "trades": s.trades + len(pnls),
+                "wins": s.wins + wins,
+                "losses": s.losses + losses,
+                "gross_pnl": s.gross_pnl + total,
+                "gross_profit": s.gross_profit + profit,
+                "gross_loss": s.gross_loss + lost,
+                "rr_sum": s.rr_sum + sum(rrs),
+                "rr_count": s.rr_count + len(rrs),
+                "equity": s.equity + total,
+                "equity_peak": func.max(s.equity_peak, s.equity + run_max),
+                "max_drawdown": func.max(s.max_drawdown, s.equity_peak - s.equity - run_min, inner_dd),
+                "updated_at": now,
+            },
+        )
+    )
+    db.execute(stmt)
+
+
+def rebuild_strategy_stats(db: Session, user_id: int | None = None) -> int:
+    """Recompute strategy_stats from finalized journal entries (in close order); returns row count."""
+    j, sig = models.TradeJournalEntry, models.Signal
+    q = (
+        select(j.user_id, sig.strategy_id, j.pnl, j.rr)
+        .join(sig, sig.id == j.signal_id)
+        .where(j.is_finalized == True, sig.strategy_id.isnot(None))
+        .order_by(j.closed_at, j.id)
+        .execution_options(yield_per=5000)
+    )
+    if user_id is not None:
+        q = q.where(j.user_id == user_id)
+
+    acc: dict[tuple[int, int], dict] = {}
+    for uid, sid, pnl, rr in db.execute(q):
+        pnl = float(pnl or 0.0)
+        a = acc.setdefault((uid, sid), {
+            "user_id": uid, "strategy_id": sid, "trades": 0, "wins": 0, "losses": 0,
+            "gross_pnl": 0.0, "gross_profit": 0.0, "gross_loss": 0.0, "rr_sum": 0.0, "rr_count": 0,
+            "equity": 0.0, "equity_peak": 0.0, "max_drawdown": 0.0,
+        })
+        a["trades"] += 1
+        a["wins"] += pnl > 0
+        a["losses"] += pnl < 0
+        a["gross_pnl"] += pnl
+        a["gross_profit"] += max(pnl, 0.0)
+        a["gross_loss"] += max(-pnl, 0.0)
+        if rr is not None:
+            a["rr_sum"] += float(rr)
+            a["rr_count"] += 1
+        a["equity"] += pnl
+        a["equity_peak"] = max(a["equity_peak"], a["equity"])
+        a["max_drawdown"] = max(a["max_drawdown"], a["equity_peak"] - a["equity"])
+
+    d = delete(models.StrategyStat)
+    if user_id is not None:
+        d = d.where(models.StrategyStat.user_id == user_id)
+    db.execute(d)
+    if acc:
+        now = datetime.utcnow()
+        db.execute(insert(models.StrategyStat), [dict(a, updated_at=now) for a in acc.values()])
+    db.commit()
+    return len(acc)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the strategy_stats rollup table.")
+    parser.add_argument("--rebuild", action="store_true", help="recompute from finalized journal entries")
+    parser.add_argument("--user-id", type=int, default=None)
+    args = parser.parse_args()
+    if not args.rebuild:
+        parser.error("nothing to do (use --rebuild)")
+
+    from app.database import Base, SessionLocal, engine
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        print(f"rebuilt {rebuild_strategy_stats(db, args.user_id)} strategy_stats rows")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Process-wide SymbolSpec registry keyed by (market, symbol).
+
+The symbol_specs table is tiny and nearly static, so it is held in memory as immutable
+snapshots instead of being queried on every trade close. The registry is:
+
+- loaded at startup, and lazily on first use;
+- reloaded by the admin create/update endpoints right after their commit;
+- reloaded once it is older than SYMBOL_SPEC_REGISTRY_TTL_SECONDS, so edits made through
+  another worker show up within that window. Set the TTL to 0 with a single worker.
+"""
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app import models
+
+
+@dataclass(frozen=True)
+class SymbolSpecSnapshot:
+    id: int
+    market: str
+    symbol: str
+    pip_size: float | None = None
+    pip_value: float | None = None
+    contract_size: float | None = None
+    tick_size: float | None = None
+    tick_value: float | None = None
+    point_value: float | None = None
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
+
+    @classmethod
+    def from_model(cls, spec: models.SymbolSpec) -> "SymbolSpecSnapshot":
+        return cls(**{f: getattr(spec, f) for f in cls.__dataclass_fields__})
+
+
+class SymbolSpecRegistry:
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._specs: dict[tuple[str, str], SymbolSpecSnapshot] | None = None
+        self._loaded_at = 0.0
+        self.lookups = 0
+        self.reloads = 0
+
+    def reload(self, db: Session):
+        specs = {}
+        for spec in db.query(models.SymbolSpec).order_by(models.SymbolSpec.id).all():
+            specs.setdefault((spec.market, spec.symbol), SymbolSpecSnapshot.from_model(spec))
+        with self._lock:
+            self._specs = specs
+            self._loaded_at = time.monotonic()
+            self.reloads += 1
+
+    def _current(self, db: Session) -> dict[tuple[str, str], SymbolSpecSnapshot]:
+        specs = self._specs
+        if specs is None or (self.ttl_seconds and time.monotonic() - self._loaded_at >= self.ttl_seconds):
+            self.reload(db)
+            specs = self._specs
+        return specs
+
+    def get(self, db: Session, market: str, symbol: str) -> SymbolSpecSnapshot | None:
+        spec = self._current(db).get((market, symbol))
+        self.lookups += 1
+        return spec
+
+    def all(self, db: Session) -> list[SymbolSpecSnapshot]:
+        return list(self._current(db).values())
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self._specs is not None,
+            "specs": len(self._specs or {}),
+            "ttl_seconds": self.ttl_seconds,
+            "lookups": self.lookups,
+            "reloads": self.reloads,
+        }
+
+
+symbol_spec_registry = SymbolSpecRegistry(ttl_seconds=settings.SYMBOL_SPEC_REGISTRY_TTL_SECONDS)
@@ -0,0 +1,113 @@
+"""Process-local deny-list of revoked access/refresh tokens, keyed by user id (stateless auth).
+
+With AUTH_STATELESS, access tokens carry the user's role and active flag and get_current_user
+trusts them without reading users/roles. A role or active change therefore has to revoke the
+user's earlier tokens: /admin/users/{id}/role, /active and /revoke-tokens upsert the user's
+token_revocations row (revoked_at = now) in the same transaction and write it through here
+right after the commit. A token whose iat is at or before its user's revoked_at is rejected.
+
+Refresh tokens are single use: /auth/refresh records the presented token's jti in
+used_refresh_tokens (mark_refresh_used) before issuing a new pair. Presenting a used token
+again is treated as theft and revokes all of the user's tokens. Rows are pruned once the
+token has expired.
+
+The list holds one float per revoked user and is reloaded from token_revocations every
+TOKEN_DENYLIST_REFRESH_SECONDS (0 = only at startup, single worker), so a revocation made
+through another worker is enforced here after at most that long. Short access-token lifetimes
+(STATELESS_ACCESS_TOKEN_EXPIRE_MINUTES) bound how long rows stay relevant.
+"""
+import threading
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app import models
+
+
+def _epoch(dt: datetime) -> float:
+    # revoked_at is stored as naive UTC
+    return dt.replace(tzinfo=timezone.utc).timestamp()
+
+
+class TokenDenyList:
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._entries: dict[int, float] = {}
+        self._loaded_at: float | None = None
+        self.reloads = 0
+        self.rejections = 0
+
+    def reload(self, db: Session):
+        t = models.TokenRevocation
+        entries = {uid: _epoch(ts) for uid, ts in db.execute(select(t.user_id, t.revoked_at))}
+        with self._lock:
+            self._entries = entries
+            self._loaded_at = time.monotonic()
+            self.reloads += 1
+
+    def _stale(self) -> bool:
+        if self._loaded_at is None:
+            return True
+        return bool(self.refresh_seconds) and time.monotonic() - self._loaded_at >= self.refresh_seconds
+
+    def is_revoked(self, db: Session, user_id: int, issued_at: float) -> bool:
+        if self._stale():
+            self.reload(db)
+        with self._lock:
+            cutoff = self._entries.get(user_id)
+        if cutoff is not None and issued_at <= cutoff:
+            self.rejections += 1
+            return True
+        return False
+
+    def revoke(self, db: Session, user_id: int, reason: str) -> float:
+        """Upsert user_id's revocation row (not committed); pass the result to put() after commit."""
+        now = datetime.utcnow()
+        stmt = (
+            sqlite_insert(models.TokenRevocation)
+            .values(user_id=user_id, revoked_at=now, reason=reason)
+            .on_conflict_do_update(index_elements=["user_id"], set_={"revoked_at": now, "reason": reason})
+        )
+        db.execute(stmt)
+        return _epoch(now)
+
+    def put(self, user_id: int, revoked_at: float):
+        """Write-through: call after committing revoke()."""
+        with self._lock:
+            if revoked_at > self._entries.get(user_id, float("-inf")):
+                self._entries[user_id] = revoked_at
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "refresh_seconds": self.refresh_seconds,
+            "reloads": self.reloads,
+            "rejections": self.rejections,
+        }
+
+
+def mark_refresh_used(db: Session, user_id: int, jti: str, expires_at: datetime) -> bool:
+    """Record a refresh token as exchanged and commit; False if it had been used before."""
+    db.add(models.UsedRefreshToken(jti=jti, user_id=user_id, expires_at=expires_at))
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return False
+    return True
+
+
+def prune_used_refresh_tokens(db: Session) -> int:
+    t = models.UsedRefreshToken
+    deleted = db.execute(delete(t).where(t.expires_at < datetime.utcnow())).rowcount
+    db.commit()
+    return deleted
+
+
+token_denylist = TokenDenyList(refresh_seconds=settings.TOKEN_DENYLIST_REFRESH_SECONDS)
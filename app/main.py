@@ -1,8 +1,14 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.routers import users, auth, admin, trading, engine
-from app.database import Base, engine as db_engine
+from app.database import Base, SessionLocal, engine as db_engine
 from app import models
+from app.core.audit_writer import audit_writer
+from app.core.hash_pool import hash_pool
+from app.core.migrations import run_sqlite_migrations
+from app.core.lockout_index import lockout_index
+from app.core.symbol_specs import symbol_spec_registry
+from app.core.token_denylist import prune_used_refresh_tokens, token_denylist
 
 app = FastAPI(title="TheButtonApp API")
 
@@ -16,6 +22,7 @@ app.add_middleware(
 )
 
 Base.metadata.create_all(bind=db_engine)
+run_sqlite_migrations()
 
 app.include_router(auth.router)
 app.include_router(users.router)
@@ -23,6 +30,48 @@ app.include_router(admin.router)
 app.include_router(trading.router)
 app.include_router(engine.router)
 
+@app.on_event("startup")
+def start_audit_writer():
+    audit_writer.start()
+
+@app.on_event("startup")
+def start_hash_pool():
+    hash_pool.start()
+
+@app.on_event("startup")
+def build_lockout_index():
+    db = SessionLocal()
+    try:
+        lockout_index.rebuild(db)
+    finally:
+        db.close()
+
+@app.on_event("startup")
+def load_symbol_specs():
+    db = SessionLocal()
+    try:
+        symbol_spec_registry.reload(db)
+    finally:
+        db.close()
+
+@app.on_event("startup")
+def load_token_denylist():
+    db = SessionLocal()
+    try:
+        token_denylist.reload(db)
+        prune_used_refresh_tokens(db)
+    finally:
+        db.close()
+
+@app.on_event("shutdown")
+def stop_audit_writer():
+    # drains the queue so no audit record is lost on a clean shutdown
+    audit_writer.stop()
+
+@app.on_event("shutdown")
+def stop_hash_pool():
+    hash_pool.stop()
+
 @app.get("/")
 def root():
     return {"status": "ok"}
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Float, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Float, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -32,6 +32,11 @@ class StrategyTemplate(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # keyset pagination of a user's list (id desc)
+    __table_args__ = (
+        Index("ix_strategy_templates_user_id_id", "user_id", "id"),
+    )
+
 class RiskProfile(Base):
     __tablename__ = "risk_profiles"
     id = Column(Integer, primary_key=True, index=True)
@@ -46,6 +51,11 @@ class RiskProfile(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # keyset pagination of a user's list (id desc)
+    __table_args__ = (
+        Index("ix_risk_profiles_user_id_id", "user_id", "id"),
+    )
+
 class Signal(Base):
     __tablename__ = "signals"
     id = Column(Integer, primary_key=True, index=True)
@@ -68,6 +78,29 @@ class Signal(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # keyset pagination of a user's list (id desc), optionally by status
+    __table_args__ = (
+        Index("ix_signals_user_id_id", "user_id", "id"),
+        Index("ix_signals_user_id_status_id", "user_id", "status", "id"),
+    )
+
+class SignalEvent(Base):
+    """Append-only history of signal status transitions."""
+    __tablename__ = "signal_events"
+    id = Column(Integer, primary_key=True, index=True)
+    signal_id = Column(Integer, ForeignKey("signals.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)  # signal owner
+    actor_id = Column(Integer, ForeignKey("users.id"), nullable=True)  # who made the transition
+    from_status = Column(String, nullable=True)
+    to_status = Column(String, nullable=False)
+    source = Column(String, nullable=True)  # "patch" or "bulk"
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_signal_events_signal_id_id", "signal_id", "id"),
+        Index("ix_signal_events_user_id_id", "user_id", "id"),
+    )
+
 class TradeJournalEntry(Base):
     __tablename__ = "trade_journal_entries"
     id = Column(Integer, primary_key=True, index=True)
@@ -91,9 +124,18 @@ class TradeJournalEntry(Base):
     closed_at = Column(DateTime(timezone=True), nullable=True)
     pnl_calc_mode = Column(String, nullable=True)
     used_risk_profile_id = Column(Integer, ForeignKey("risk_profiles.id"), nullable=True)
+    # size the pnl was priced with when it is not the linked signal's (imported trades)
+    position_size_units = Column(Float, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # journal analytics (finalized trades in close order) and keyset pagination (id desc)
+    __table_args__ = (
+        Index("ix_trade_journal_entries_user_id_finalized_closed_at", "user_id", "is_finalized", "closed_at"),
+        Index("ix_trade_journal_entries_user_id_id", "user_id", "id"),
+        Index("ix_trade_journal_entries_user_id_finalized_id", "user_id", "is_finalized", "id"),
+    )
+
 class DailyMetric(Base):
     __tablename__ = "daily_metrics"
     id = Column(Integer, primary_key=True, index=True)
@@ -106,6 +148,46 @@ class DailyMetric(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # one row per user and day: counters are maintained with INSERT ... ON CONFLICT DO UPDATE
+    __table_args__ = (
+        Index("ux_daily_metrics_user_id_day", "user_id", "day", unique=True),
+    )
+
+class StrategyStat(Base):
+    """Per-(user, strategy) performance rollup, updated incrementally on journal finalize."""
+    __tablename__ = "strategy_stats"
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    strategy_id = Column(Integer, ForeignKey("strategy_templates.id"), nullable=False)
+    trades = Column(Integer, default=0)
+    wins = Column(Integer, default=0)
+    losses = Column(Integer, default=0)
+    gross_pnl = Column(Float, default=0.0)
+    gross_profit = Column(Float, default=0.0)
+    gross_loss = Column(Float, default=0.0)
+    rr_sum = Column(Float, default=0.0)
+    rr_count = Column(Integer, default=0)
+    equity = Column(Float, default=0.0)  # cumulative pnl, for drawdown tracking
+    equity_peak = Column(Float, default=0.0)
+    max_drawdown = Column(Float, default=0.0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        Index("ux_strategy_stats_user_id_strategy_id", "user_id", "strategy_id", unique=True),
+    )
+
+    @property
+    def win_rate(self):
+        return round(self.wins / self.trades, 4) if self.trades else None
+
+    @property
+    def avg_rr(self):
+        return round(self.rr_sum / self.rr_count, 4) if self.rr_count else None
+
+    @property
+    def expectancy(self):
+        return round(self.gross_pnl / self.trades, 2) if self.trades else None
+
 class AuditLog(Base):
     __tablename__ = "audit_logs"
     id = Column(Integer, primary_key=True, index=True)
@@ -117,6 +199,15 @@ class AuditLog(Base):
     response_json = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    # keyset pagination: every filter combination walks an index in id order
+    __table_args__ = (
+        Index("ix_audit_logs_user_id_id", "user_id", "id"),
+        Index("ix_audit_logs_user_id_action_id", "user_id", "action", "id"),
+        Index("ix_audit_logs_action_id", "action", "id"),
+        Index("ix_audit_logs_entity_type_id", "entity_type", "id"),
+        Index("ix_audit_logs_created_at_id", "created_at", "id"),
+    )
+
 class SymbolSpec(Base):
     __tablename__ = "symbol_specs"
     id = Column(Integer, primary_key=True, index=True)
@@ -128,4 +219,36 @@ class SymbolSpec(Base):
     tick_size = Column(Float, nullable=True)
     tick_value = Column(Float, nullable=True)
     point_value = Column(Float, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # one spec per instrument; served from app/core/symbol_specs.py, not queried per trade
+    __table_args__ = (
+        Index("ux_symbol_specs_market_symbol", "market", "symbol", unique=True),
+    )
+
+class TokenRevocation(Base):
+    """Tokens of user_id issued at or before revoked_at are no longer accepted (stateless auth)."""
+    __tablename__ = "token_revocations"
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    revoked_at = Column(DateTime, nullable=False)  # naive UTC
+    reason = Column(String, nullable=True)  # "role", "active", "admin" or "refresh_reuse"
+
+    # one row per user, moved forward on every revocation
+    __table_args__ = (
+        Index("ux_token_revocations_user_id", "user_id", unique=True),
+    )
+
+class UsedRefreshToken(Base):
+    """Refresh tokens already exchanged at /auth/refresh (single use); kept until they expire."""
+    __tablename__ = "used_refresh_tokens"
+    id = Column(Integer, primary_key=True, index=True)
+    jti = Column(String, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    expires_at = Column(DateTime, nullable=False)  # naive UTC
+
+    __table_args__ = (
+        Index("ux_used_refresh_tokens_jti", "jti", unique=True),
+        Index("ix_used_refresh_tokens_expires_at", "expires_at"),
+    )
@@ -5,13 +5,17 @@ from sqlalchemy.orm import Session
 from app.database import get_db
 from app import models, schemas
 from app.core.security import require_admin
+from app.core.plan_cache import plan_cache
+from app.core.principal_cache import Principal, principal_cache
+from app.core.token_denylist import token_denylist
+from app.core.lockout_index import DailyState, lockout_index
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
 @router.get("/users")
 def list_users(
     db: Session = Depends(get_db),
-    _: models.User = Depends(require_admin),
+    _: Principal = Depends(require_admin),
 ):
     users = db.query(models.User).all()
     return [
@@ -24,7 +28,7 @@ def update_role(
     user_id: int,
     payload: schemas.RoleUpdate,
     db: Session = Depends(get_db),
-    _: models.User = Depends(require_admin),
+    _: Principal = Depends(require_admin),
 ):
     user = db.query(models.User).filter(models.User.id == user_id).first()
     if not user:
@@ -35,7 +39,11 @@ def update_role(
         raise HTTPException(400, "Role not found")
 
     user.role_id = role.id
+    revoked_at = token_denylist.revoke(db, user.id, "role")
     db.commit()
+    token_denylist.put(user.id, revoked_at)
+    principal_cache.invalidate(user.id)
+    plan_cache.bump(user.id)
     return {"status": "role updated", "user_id": user.id, "role": role.name}
 
 @router.patch("/users/{user_id}/active")
@@ -43,21 +51,41 @@ def set_active(
     user_id: int,
     payload: schemas.ActiveUpdate,
     db: Session = Depends(get_db),
-    _: models.User = Depends(require_admin),
+    _: Principal = Depends(require_admin),
 ):
     user = db.query(models.User).filter(models.User.id == user_id).first()
     if not user:
         raise HTTPException(404, "User not found")
 
     user.is_active = payload.is_active
+    revoked_at = token_denylist.revoke(db, user.id, "active")
     db.commit()
+    token_denylist.put(user.id, revoked_at)
+    principal_cache.invalidate(user.id)
+    plan_cache.bump(user.id)
     return {"status": "active updated", "user_id": user.id, "is_active": user.is_active}
+
+@router.post("/users/{user_id}/revoke-tokens")
+def revoke_tokens(
+    user_id: int,
+    db: Session = Depends(get_db),
+    _: Principal = Depends(require_admin),
+):
+    """Reject every token issued to the user so far (stateless access and refresh tokens)."""
+    user = db.query(models.User).filter(models.User.id == user_id).first()
+    if not user:
+        raise HTTPException(404, "User not found")
+
+    revoked_at = token_denylist.revoke(db, user.id, "admin")
+    db.commit()
+    token_denylist.put(user.id, revoked_at)
+    return {"status": "tokens revoked", "user_id": user.id}
 # Phase 4.2: Admin unlock user
 @router.post("/users/{user_id}/unlock-today")
 def unlock_today(
     user_id: int,
     db: Session = Depends(get_db),
-    _: models.User = Depends(require_admin),
+    _: Principal = Depends(require_admin),
 ):
     """Admin endpoint to unlock a user's daily lockout"""
     from datetime import datetime, timezone
@@ -76,6 +104,9 @@ def unlock_today(
         return {"status": "no metric for today", "user_id": user_id, "day": day}
     
     dm.locked_out = False
+    state = DailyState.from_metric(dm)
     db.commit()
+    lockout_index.put(user_id, day, state)
+    plan_cache.bump(user_id)
     
     return {"status": "unlocked", "user_id": user_id, "day": day}
\ No newline at end of file
@@ -1,10 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload
+from starlette.concurrency import run_in_threadpool
 
 from app.database import get_db
 from app import models, schemas
-from app.core.security import verify_password, get_password_hash, create_access_token
+from app.core.security import issue_tokens, refresh_user
+from app.core.hash_pool import hash_pool
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -13,9 +16,9 @@ def _maybe_bootstrap_admin(db: Session, email: str) -> bool:
     existing_admin = db.query(models.User).filter(models.User.is_admin == True).first()
     return existing_admin is None
 
-@router.post("/register")
-def register(payload: schemas.UserCreate, db: Session = Depends(get_db)):
-    existing = db.query(models.User).filter(models.User.email == payload.email).first()
+def _registration_role(db: Session, email: str) -> tuple[int, bool]:
+    """(role_id, is_admin) for a new account; fails if the email is taken."""
+    existing = db.query(models.User).filter(models.User.email == email).first()
     if existing:
         raise HTTPException(400, "Email already registered")
     
@@ -34,23 +37,26 @@ def register(payload: schemas.UserCreate, db: Session = Depends(get_db)):
         db.commit()
         db.refresh(admin_role)
     
-    role_id = user_role.id
-    is_admin = False
-    
     # Bootstrap admin
-    if _maybe_bootstrap_admin(db, payload.email):
-        role_id = admin_role.id
-        is_admin = True
-    
+    if _maybe_bootstrap_admin(db, email):
+        return admin_role.id, True
+    return user_role.id, False
+
+def _create_user(db: Session, email: str, hashed_password: str, role_id: int, is_admin: bool) -> dict:
     user = models.User(
-        email=payload.email,
-        hashed_password=get_password_hash(payload.password),
+        email=email,
+        hashed_password=hashed_password,
         role_id=role_id,
         is_active=True,
         is_admin=is_admin,
     )
     db.add(user)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # registered concurrently while the password was being hashed
+        db.rollback()
+        raise HTTPException(400, "Email already registered")
     db.refresh(user)
     
     return {
@@ -60,11 +66,27 @@ def register(payload: schemas.UserCreate, db: Session = Depends(get_db)):
         "role": user.role.name,
     }
 
+def _find_user(db: Session, email: str) -> models.User | None:
+    # role is loaded up front: stateless tokens embed it
+    return db.query(models.User).options(joinedload(models.User.role)).filter(models.User.email == email).first()
+
+# register/login are async so argon2 runs in hash_pool without holding a threadpool
+# worker; their (short) DB work still goes through the threadpool.
+@router.post("/register")
+async def register(payload: schemas.UserCreate, db: Session = Depends(get_db)):
+    role_id, is_admin = await run_in_threadpool(_registration_role, db, payload.email)
+    hashed_password = await hash_pool.hash(payload.password)
+    return await run_in_threadpool(_create_user, db, payload.email, hashed_password, role_id, is_admin)
+
 @router.post("/login", response_model=schemas.Token)
-def login(form: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.email == form.username).first()
-    if not user or not verify_password(form.password, user.hashed_password):
+async def login(form: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+    user = await run_in_threadpool(_find_user, db, form.username)
+    if not user or not await hash_pool.verify(form.password, user.hashed_password):
         raise HTTPException(401, "Invalid credentials")
     
-    token = create_access_token(str(user.id))
-    return {"access_token": token, "token_type": "bearer"}
\ No newline at end of file
+    return issue_tokens(user)
+
+@router.post("/refresh", response_model=schemas.Token)
+def refresh(payload: schemas.RefreshRequest, db: Session = Depends(get_db)):
+    """New access token (with current role/active claims) and a rotated refresh token."""
+    return issue_tokens(refresh_user(db, payload.refresh_token))
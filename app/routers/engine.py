@@ -1,11 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-import json
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+import numpy as np
+from sqlalchemy import and_, false, null, or_, select
+from sqlalchemy.orm import Session, joinedload
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
+from typing import Optional
 
 from app.database import get_db
 from app import models, schemas
 from app.core.security import get_current_user
+from app.core.config import settings
+from app.core.audit_writer import AuditRecord, audit_writer, write_audit
+from app.core.plan_cache import plan_cache
+from app.core.strategy_rules import CompiledRules, RuleInput, get_compiled_rules
+from app.core.metrics import GateTimer, gate_metrics
+from app.core.journal_analytics import journal_analytics_cache
+from app.core.symbol_specs import symbol_spec_registry
+from app.core.principal_cache import Principal, principal_cache
+from app.core.hash_pool import hash_pool
+from app.core.token_denylist import token_denylist
+from app.core.lockout_index import DailyState, lockout_index
+from app.core.pagination import as_utc_naive, decode_id_cursor, encode_cursor
+from app.core.audit_archive import archive_audit_logs, read_archived
 
 router = APIRouter(prefix="/engine", tags=["engine"])
 
@@ -22,18 +38,9 @@ def round_price(x: float | None, nd: int = 6):
 def utc_day_str() -> str:
     return datetime.now(timezone.utc).strftime("%Y-%m-%d")
 
-def is_admin(user: models.User) -> bool:
+def is_admin(user: Principal) -> bool:
     return user.role is not None and user.role.name == "admin"
 
-def get_default_risk_profile(db: Session, user_id: int):
-    rp = db.query(models.RiskProfile).filter(
-        models.RiskProfile.user_id == user_id,
-        models.RiskProfile.is_default == True
-    ).first()
-    if rp:
-        return rp
-    return db.query(models.RiskProfile).filter(models.RiskProfile.user_id == user_id).first()
-
 def calc_rr(direction: str, entry: float, sl: float, tp: float | None):
     if tp is None:
         return None
@@ -51,98 +58,235 @@ def calc_position_size(rp: models.RiskProfile, entry: float, sl: float):
     units = risk_amount / stop_distance
     return risk_amount, stop_distance, units
 
-def daily_lockout_active(db: Session, user_id: int) -> bool:
+# Vectorized kernels: same math as calc_rr / calc_position_size over broadcastable arrays.
+# Invalid placements (zero stop distance) come back as NaN instead of None.
+def calc_rr_vec(direction: str, entry, sl, tp) -> np.ndarray:
+    entry, sl, tp = (np.asarray(a, dtype=float) for a in (entry, sl, tp))
+    risk = np.abs(entry - sl)
+    reward = (tp - entry) if direction == "long" else (entry - tp)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(risk > 0, reward / risk, np.nan)
+
+def calc_position_size_vec(rp: models.RiskProfile, entry, sl):
+    entry, sl = np.asarray(entry, dtype=float), np.asarray(sl, dtype=float)
+    stop_distance = np.abs(entry - sl)
+    valid = stop_distance > 0
+    risk_amount = np.where(valid, rp.account_balance * (rp.risk_per_trade_pct / 100.0), np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        units = np.where(valid, risk_amount / stop_distance, np.nan)
+    return risk_amount, np.where(valid, stop_distance, np.nan), units
+
+def _nan_to_none(arr: np.ndarray, nd: int) -> list:
+    return [None if np.isnan(x) else round(float(x), nd) for x in np.asarray(arr, dtype=float).ravel()]
+
+@dataclass
+class PlanContext:
+    """Everything build_plan needs from the DB, loaded once per user/request (or batch)."""
+    is_admin: bool = False
+    daily: DailyState = field(default_factory=DailyState)
+    strategies: dict[int, models.StrategyTemplate] = field(default_factory=dict)
+    risk_profiles: dict[int, models.RiskProfile] = field(default_factory=dict)
+    default_risk_profile: models.RiskProfile | None = None
+
+def load_plan_context(db: Session, user: Principal, payloads: list[schemas.EnginePlanRequest], authoritative_daily: bool = False) -> PlanContext:
+    strategy_ids = {p.strategy_id for p in payloads if p.strategy_id is not None}
+    rp_ids = {p.risk_profile_id for p in payloads if p.risk_profile_id is not None}
+    return load_plan_context_for_ids(db, user, strategy_ids, rp_ids, authoritative_daily)
+
+def load_plan_context_for_ids(
+    db: Session,
+    user: Principal,
+    strategy_ids: set[int],
+    rp_ids: set[int],
+    authoritative_daily: bool = False,
+) -> PlanContext:
+    """Load role, referenced strategies and risk profiles in ONE statement.
+
+    users LEFT JOIN roles / strategies / risk profiles; the result is (#strategies x #risk
+    profiles) rows at most, which stays tiny for a single user. Today's daily state comes from
+    the in-memory lockout index, unless authoritative_daily is set (commit): then today's
+    daily_metrics row is joined into the same statement and written back to the index.
+    """
+    # user's own profiles (for the default) + any explicitly referenced ones (admins may use others')
+    rp_on = models.RiskProfile.user_id == models.User.id
+    if rp_ids:
+        rp_on = or_(rp_on, models.RiskProfile.id.in_(rp_ids))
+    st_on = models.StrategyTemplate.id.in_(strategy_ids) if strategy_ids else false()
+
     day = utc_day_str()
-    dm = db.query(models.DailyMetric).filter(models.DailyMetric.user_id == user_id, models.DailyMetric.day == day).first()
-    return bool(dm and dm.locked_out)
+    dm_entity = models.DailyMetric if authoritative_daily else null()
+    stmt = (
+        select(models.Role.name, dm_entity, models.StrategyTemplate, models.RiskProfile)
+        .select_from(models.User)
+        .outerjoin(models.Role, models.Role.id == models.User.role_id)
+    )
+    if authoritative_daily:
+        stmt = stmt.outerjoin(models.DailyMetric, and_(models.DailyMetric.user_id == models.User.id, models.DailyMetric.day == day))
+    stmt = (
+        stmt.outerjoin(models.StrategyTemplate, st_on)
+        .outerjoin(models.RiskProfile, rp_on)
+        .where(models.User.id == user.id)
+    )
+
+    ctx = PlanContext()
+    for role_name, dm, st, rp in db.execute(stmt):
+        ctx.is_admin = role_name == "admin"
+        if dm is not None and not ctx.daily.locked_out:
+            ctx.daily = DailyState.from_metric(dm)
+        if st is not None:
+            ctx.strategies[st.id] = st
+        if rp is not None:
+            ctx.risk_profiles[rp.id] = rp
+
+    if authoritative_daily:
+        lockout_index.put(user.id, day, ctx.daily)
+    else:
+        ctx.daily = lockout_index.get(db, user.id)
+
+    own = sorted((rp for rp in ctx.risk_profiles.values() if rp.user_id == user.id), key=lambda rp: rp.id)
+    ctx.default_risk_profile = next((rp for rp in own if rp.is_default), own[0] if own else None)
+    return ctx
+
+def build_plan(
+    payload: schemas.EnginePlanRequest,
+    db: Session,
+    user: Principal,
+    ctx: PlanContext | None = None,
+    timer: GateTimer | None = None,
+) -> schemas.EnginePlanResponse:
+    timer = timer or GateTimer("plan")
+    if ctx is None:
+        with timer.gate("context"):
+            ctx = load_plan_context(db, user, [payload])
 
-def build_plan(payload: schemas.EnginePlanRequest, db: Session, user: models.User) -> schemas.EnginePlanResponse:
     reasons: list[str] = []
     checklist: list[schemas.EngineChecklistItem] = []
 
     # REAL daily loss gate
-    if daily_lockout_active(db, user.id):
-        reasons.append("daily loss lockout active")
-        checklist.append(schemas.EngineChecklistItem(key="daily_loss_gate", passed=False, detail="locked out for today"))
-    else:
-        checklist.append(schemas.EngineChecklistItem(key="daily_loss_gate", passed=True, detail="not locked out"))
+    with timer.gate("daily_loss_gate"):
+        if ctx.daily.locked_out:
+            reasons.append("daily loss lockout active")
+            checklist.append(schemas.EngineChecklistItem(key="daily_loss_gate", passed=False, detail="locked out for today"))
+        else:
+            checklist.append(schemas.EngineChecklistItem(key="daily_loss_gate", passed=True, detail="not locked out"))
 
     # Strategy exists
-    if payload.strategy_id is not None:
-        st = db.query(models.StrategyTemplate).filter(models.StrategyTemplate.id == payload.strategy_id).first()
-        if not st:
-            reasons.append("strategy_id not found")
-            checklist.append(schemas.EngineChecklistItem(key="strategy_exists", passed=False, detail="strategy_id invalid"))
-        else:
-            if not is_admin(user) and st.user_id != user.id:
-                reasons.append("not authorized to use this strategy")
-                checklist.append(schemas.EngineChecklistItem(key="strategy_owner", passed=False, detail="strategy not owned"))
+    rules: CompiledRules | None = None
+    with timer.gate("strategy"):
+        if payload.strategy_id is not None:
+            st = ctx.strategies.get(payload.strategy_id)
+            if not st:
+                reasons.append("strategy_id not found")
+                checklist.append(schemas.EngineChecklistItem(key="strategy_exists", passed=False, detail="strategy_id invalid"))
             else:
-                checklist.append(schemas.EngineChecklistItem(key="strategy_exists", passed=True, detail="strategy found"))
+                if not ctx.is_admin and st.user_id != user.id:
+                    reasons.append("not authorized to use this strategy")
+                    checklist.append(schemas.EngineChecklistItem(key="strategy_owner", passed=False, detail="strategy not owned"))
+                else:
+                    checklist.append(schemas.EngineChecklistItem(key="strategy_exists", passed=True, detail="strategy found"))
+                    rules = get_compiled_rules(st)
 
     # Risk profile selection
     rp = None
-    if payload.risk_profile_id is not None:
-        rp = db.query(models.RiskProfile).filter(models.RiskProfile.id == payload.risk_profile_id).first()
-        if not rp:
-            reasons.append("risk_profile_id not found")
-            checklist.append(schemas.EngineChecklistItem(key="risk_profile_exists", passed=False, detail="risk_profile_id invalid"))
-        elif not is_admin(user) and rp.user_id != user.id:
-            reasons.append("not authorized to use this risk profile")
-            checklist.append(schemas.EngineChecklistItem(key="risk_profile_owner", passed=False, detail="risk profile not owned"))
+    with timer.gate("risk_profile"):
+        if payload.risk_profile_id is not None:
+            rp = ctx.risk_profiles.get(payload.risk_profile_id)
+            if not rp:
+                reasons.append("risk_profile_id not found")
+                checklist.append(schemas.EngineChecklistItem(key="risk_profile_exists", passed=False, detail="risk_profile_id invalid"))
+            elif not ctx.is_admin and rp.user_id != user.id:
+                reasons.append("not authorized to use this risk profile")
+                checklist.append(schemas.EngineChecklistItem(key="risk_profile_owner", passed=False, detail="risk profile not owned"))
+            else:
+                checklist.append(schemas.EngineChecklistItem(key="risk_profile_exists", passed=True, detail="risk profile found"))
         else:
-            checklist.append(schemas.EngineChecklistItem(key="risk_profile_exists", passed=True, detail="risk profile found"))
-    else:
-        rp = get_default_risk_profile(db, user.id)
-        checklist.append(schemas.EngineChecklistItem(
-            key="risk_profile_default",
-            passed=rp is not None,
-            detail="default risk profile found" if rp else "no risk profile found (create one)"
-        ))
+            rp = ctx.default_risk_profile
+            checklist.append(schemas.EngineChecklistItem(
+                key="risk_profile_default",
+                passed=rp is not None,
+                detail="default risk profile found" if rp else "no risk profile found (create one)"
+            ))
+
+    # Daily trade-count / loss-streak limits: O(1) reads of the incrementally maintained
+    # DailyMetric counters (never a count over the journal)
+    if rp is not None and (rp.max_trades_per_day is not None or rp.max_consecutive_losses is not None):
+        with timer.gate("daily_limits"):
+            if rp.max_trades_per_day is not None:
+                passed = ctx.daily.trades_today < rp.max_trades_per_day
+                checklist.append(schemas.EngineChecklistItem(
+                    key="max_trades_per_day", passed=passed,
+                    detail=f"{ctx.daily.trades_today} trades today (max {rp.max_trades_per_day})",
+                ))
+                if not passed:
+                    reasons.append(f"max trades per day reached ({rp.max_trades_per_day})")
+            if rp.max_consecutive_losses is not None:
+                passed = ctx.daily.consecutive_losses < rp.max_consecutive_losses
+                checklist.append(schemas.EngineChecklistItem(
+                    key="max_consecutive_losses", passed=passed,
+                    detail=f"{ctx.daily.consecutive_losses} consecutive losses (max {rp.max_consecutive_losses})",
+                ))
+                if not passed:
+                    reasons.append(f"max consecutive losses reached ({rp.max_consecutive_losses})")
 
     # Validate entry/stop
-    if payload.entry_price is not None:
-        if payload.stop_loss is None:
-            reasons.append("stop_loss required when entry_price is provided")
-            checklist.append(schemas.EngineChecklistItem(key="stop_required", passed=False, detail="stop_loss missing"))
-        else:
-            checklist.append(schemas.EngineChecklistItem(key="stop_required", passed=True, detail="stop_loss provided"))
-
-        if payload.stop_loss is not None:
-            if payload.direction == "long" and payload.stop_loss >= payload.entry_price:
-                reasons.append("for long trades, stop_loss must be below entry_price")
-                checklist.append(schemas.EngineChecklistItem(key="direction_stop_logic", passed=False, detail="SL not below entry for long"))
-            elif payload.direction == "short" and payload.stop_loss <= payload.entry_price:
-                reasons.append("for short trades, stop_loss must be above entry_price")
-                checklist.append(schemas.EngineChecklistItem(key="direction_stop_logic", passed=False, detail="SL not above entry for short"))
+    with timer.gate("stop_validation"):
+        if payload.entry_price is not None:
+            if payload.stop_loss is None:
+                reasons.append("stop_loss required when entry_price is provided")
+                checklist.append(schemas.EngineChecklistItem(key="stop_required", passed=False, detail="stop_loss missing"))
             else:
-                checklist.append(schemas.EngineChecklistItem(key="direction_stop_logic", passed=True, detail="direction/SL consistent"))
-    else:
-        checklist.append(schemas.EngineChecklistItem(key="entry_optional", passed=True, detail="entry_price not provided; plan limited"))
+                checklist.append(schemas.EngineChecklistItem(key="stop_required", passed=True, detail="stop_loss provided"))
+
+            if payload.stop_loss is not None:
+                if payload.direction == "long" and payload.stop_loss >= payload.entry_price:
+                    reasons.append("for long trades, stop_loss must be below entry_price")
+                    checklist.append(schemas.EngineChecklistItem(key="direction_stop_logic", passed=False, detail="SL not below entry for long"))
+                elif payload.direction == "short" and payload.stop_loss <= payload.entry_price:
+                    reasons.append("for short trades, stop_loss must be above entry_price")
+                    checklist.append(schemas.EngineChecklistItem(key="direction_stop_logic", passed=False, detail="SL not above entry for short"))
+                else:
+                    checklist.append(schemas.EngineChecklistItem(key="direction_stop_logic", passed=True, detail="direction/SL consistent"))
+        else:
+            checklist.append(schemas.EngineChecklistItem(key="entry_optional", passed=True, detail="entry_price not provided; plan limited"))
 
     # Calculations
     risk_amount = stop_distance = position_size_units = rr = None
     chosen_rp_id = rp.id if rp else None
 
-    if rp and payload.entry_price is not None and payload.stop_loss is not None and len(reasons) == 0:
-        ra, sd, units = calc_position_size(rp, payload.entry_price, payload.stop_loss)
-        risk_amount = round_money(ra, 2) if ra is not None else None
-        stop_distance = round_price(sd, 6) if sd is not None else None
-        position_size_units = round_price(units, 2) if units is not None else None
-
-    if payload.entry_price is not None and payload.stop_loss is not None and payload.take_profit is not None and len(reasons) == 0:
-        rr_val = calc_rr(payload.direction, payload.entry_price, payload.stop_loss, payload.take_profit)
-        rr = round_price(rr_val, 4) if rr_val is not None else None
-        if rr is None:
-            reasons.append("could not compute rr")
-            checklist.append(schemas.EngineChecklistItem(key="rr_calc", passed=False, detail="invalid prices for rr"))
+    with timer.gate("sizing"):
+        if rp and payload.entry_price is not None and payload.stop_loss is not None and len(reasons) == 0:
+            ra, sd, units = calc_position_size(rp, payload.entry_price, payload.stop_loss)
+            risk_amount = round_money(ra, 2) if ra is not None else None
+            stop_distance = round_price(sd, 6) if sd is not None else None
+            position_size_units = round_price(units, 2) if units is not None else None
+
+    with timer.gate("rr"):
+        if payload.entry_price is not None and payload.stop_loss is not None and payload.take_profit is not None and len(reasons) == 0:
+            rr_val = calc_rr(payload.direction, payload.entry_price, payload.stop_loss, payload.take_profit)
+            rr = round_price(rr_val, 4) if rr_val is not None else None
+            if rr is None:
+                reasons.append("could not compute rr")
+                checklist.append(schemas.EngineChecklistItem(key="rr_calc", passed=False, detail="invalid prices for rr"))
+            else:
+                passed = rr >= payload.rr_min
+                checklist.append(schemas.EngineChecklistItem(key="rr_min", passed=passed, detail=f"RR={rr} (min {payload.rr_min})"))
+                if not passed:
+                    reasons.append(f"RR below minimum ({payload.rr_min})")
         else:
-            passed = rr >= payload.rr_min
-            checklist.append(schemas.EngineChecklistItem(key="rr_min", passed=passed, detail=f"RR={rr} (min {payload.rr_min})"))
-            if not passed:
-                reasons.append(f"RR below minimum ({payload.rr_min})")
-    else:
-        checklist.append(schemas.EngineChecklistItem(key="rr_min", passed=True, detail="TP not provided; rr gate skipped"))
+            checklist.append(schemas.EngineChecklistItem(key="rr_min", passed=True, detail="TP not provided; rr gate skipped"))
+
+    # Strategy rules (compiled once per strategy version, evaluated on raw prices)
+    if rules is not None and (rules.rules or rules.error):
+        with timer.gate("strategy_rules"):
+            rule_sd = rule_rr = None
+            if payload.entry_price is not None and payload.stop_loss is not None:
+                rule_sd = abs(payload.entry_price - payload.stop_loss)
+                rr_val = calc_rr(payload.direction, payload.entry_price, payload.stop_loss, payload.take_profit)
+                rule_rr = round_price(rr_val, 4) if rr_val is not None else None
+            for item in rules.evaluate(RuleInput(payload, datetime.now(timezone.utc).time(), rule_rr, rule_sd)):
+                checklist.append(item)
+                if not item.passed:
+                    reasons.append(f"strategy rule failed: {item.detail}")
 
     allowed = len(reasons) == 0
     recommendation = "place_order_or_wait_for_trigger" if allowed else "do_not_trade"
@@ -159,95 +303,297 @@ def build_plan(payload: schemas.EnginePlanRequest, db: Session, user: models.Use
         recommendation=recommendation,
     )
 
+def plan_cache_key(payload: schemas.EnginePlanRequest, user_id: int) -> tuple:
+    # day is part of the key so lockouts and daily counters roll over at UTC midnight
+    return (user_id, plan_cache.version(user_id), utc_day_str(), payload.model_dump_json())
+
+def _ctx_cacheable(ctx: PlanContext, user: Principal) -> bool:
+    # plans built on another user's strategy/profile (admins only) would miss that user's version bumps;
+    # session-window rules depend on the clock
+    return all(
+        st.user_id == user.id and not get_compiled_rules(st).time_dependent for st in ctx.strategies.values()
+    ) and all(rp.user_id == user.id for rp in ctx.risk_profiles.values())
+
+def build_plans_cached(
+    payloads: list[schemas.EnginePlanRequest],
+    db: Session,
+    user: Principal,
+    timer: GateTimer | None = None,
+) -> list[schemas.EnginePlanResponse]:
+    """build_plan through the plan cache; the context is loaded once, only for the misses.
+
+    Cached responses are shared between requests and must not be mutated.
+    """
+    timer = timer or GateTimer("plan")
+    with timer.gate("cache_lookup"):
+        keys = [plan_cache_key(p, user.id) for p in payloads]
+        results: list[schemas.EnginePlanResponse | None] = [plan_cache.get(k) for k in keys]
+    misses = [i for i, r in enumerate(results) if r is None]
+    if misses:
+        with timer.gate("context"):
+            ctx = load_plan_context(db, user, [payloads[i] for i in misses])
+            cacheable = _ctx_cacheable(ctx, user)
+        for i in misses:
+            results[i] = build_plan(payloads[i], db, user, ctx, timer)
+            if cacheable:
+                plan_cache.put(keys[i], results[i])
+    return results
+
+def _set_server_timing(response: Response, *timers: GateTimer):
+    if settings.ENGINE_SERVER_TIMING:
+        response.headers["Server-Timing"] = ", ".join(t.server_timing() for t in timers)
+
 # TEMPORARY: Make plan public for testing (remove auth)
 @router.post("/plan", response_model=schemas.EnginePlanResponse)
-def plan(payload: schemas.EnginePlanRequest, db: Session = Depends(get_db)):
+def plan(payload: schemas.EnginePlanRequest, response: Response, db: Session = Depends(get_db)):
     # Use hardcoded test user (trader@test.com - user ID 2)
-    fake_user = db.query(models.User).filter(models.User.id == 2).first()
+    fake_user = db.query(models.User).options(joinedload(models.User.role)).filter(models.User.id == 2).first()
     if not fake_user:
         raise HTTPException(404, "Test user not found - please register trader@test.com first")
-    return build_plan(payload, db, fake_user)
+    timer = GateTimer("plan")
+    result = build_plans_cached([payload], db, Principal.from_user(fake_user), timer)[0]
+    _set_server_timing(response, timer)
+    return result
+
+@router.post("/plan/batch", response_model=list[schemas.EnginePlanResponse])
+def plan_batch(payload: schemas.EnginePlanBatchRequest, response: Response, db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
+    # One context load for the whole scan cycle; results come back in candidate order.
+    timer = GateTimer("plan")
+    results = build_plans_cached(payload.candidates, db, user, timer)
+    _set_server_timing(response, timer)
+    return results
+
+@router.get("/cache/stats")
+def cache_stats(user: Principal = Depends(get_current_user)):
+    if not is_admin(user):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return plan_cache.stats()
+
+@router.get("/metrics")
+def engine_metrics(user: Principal = Depends(get_current_user)):
+    if not is_admin(user):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return {
+        "gates": gate_metrics.snapshot(),
+        "plan_cache": plan_cache.stats(),
+        "audit_writer": audit_writer.stats(),
+        "lockout_index": lockout_index.stats(),
+        "journal_analytics_cache": journal_analytics_cache.stats(),
+        "symbol_specs": symbol_spec_registry.stats(),
+        "principal_cache": principal_cache.stats(),
+        "hash_pool": hash_pool.stats(),
+        "token_denylist": token_denylist.stats(),
+    }
+
+def _sweep_axis(values: list[float] | None, rng: schemas.EngineSweepRange | None) -> np.ndarray | None:
+    if values:
+        return np.asarray(values, dtype=float)
+    if rng is not None:
+        return np.linspace(rng.start, rng.end, rng.steps)
+    return None
+
+@router.post("/plan/sweep", response_model=schemas.EngineSweepResponse)
+def plan_sweep(payload: schemas.EngineSweepRequest, db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
+    """What-if grid: sizing per stop placement and RR per (stop, target) pair, in one call."""
+    if payload.direction not in ("long", "short"):
+        raise HTTPException(status_code=400, detail="direction must be 'long' or 'short'")
+    stops = _sweep_axis(payload.stop_losses, payload.stop_range)
+    if stops is None:
+        raise HTTPException(status_code=400, detail="Provide stop_losses or stop_range")
+    targets = _sweep_axis(payload.take_profits, payload.take_profit_range)
+
+    rp_ids = {payload.risk_profile_id} if payload.risk_profile_id is not None else set()
+    ctx = load_plan_context_for_ids(db, user, set(), rp_ids)
+    rp = ctx.risk_profiles.get(payload.risk_profile_id) if payload.risk_profile_id is not None else ctx.default_risk_profile
+    if not rp or (not ctx.is_admin and rp.user_id != user.id):
+        raise HTTPException(status_code=404, detail="Risk profile not found")
+
+    # stops on the wrong side of entry are not placements, same rule as build_plan
+    entry = payload.entry_price
+    wrong_side = stops >= entry if payload.direction == "long" else stops <= entry
+    risk_amount, stop_distance, units = calc_position_size_vec(rp, entry, stops)
+    risk_amount[wrong_side] = stop_distance[wrong_side] = units[wrong_side] = np.nan
+
+    rr_grid: list[list[float | None]] = []
+    if targets is not None:
+        rr = calc_rr_vec(payload.direction, entry, stops[:, None], targets[None, :])
+        rr[wrong_side, :] = np.nan
+        rr_grid = [_nan_to_none(row, 4) for row in rr]
+
+    return schemas.EngineSweepResponse(
+        risk_profile_id=rp.id,
+        direction=payload.direction,
+        entry_price=entry,
+        stop_losses=_nan_to_none(stops, 6),
+        take_profits=_nan_to_none(targets, 6) if targets is not None else [],
+        risk_amount=_nan_to_none(risk_amount, 2),
+        stop_distance=_nan_to_none(stop_distance, 6),
+        position_size_units=_nan_to_none(units, 2),
+        rr=rr_grid,
+    )
 
 @router.post("/commit", response_model=schemas.EngineCommitResponse)
-def commit(payload: schemas.EnginePlanRequest, db: Session = Depends(get_db), user: models.User = Depends(get_current_user)):
-    plan_obj = build_plan(payload, db, user)
+def commit(payload: schemas.EnginePlanRequest, response: Response, db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
+    plan_timer, timer = GateTimer("plan"), GateTimer("commit")
+    with plan_timer.gate("context"):
+        # commit re-reads today's lockout from the DB instead of trusting this worker's index
+        ctx = load_plan_context(db, user, [payload], authoritative_daily=True)
+    plan_obj = build_plan(payload, db, user, ctx, plan_timer)
     if not plan_obj.allowed:
         raise HTTPException(status_code=400, detail={"message": "Plan not allowed", "reasons": plan_obj.reasons})
 
-    sig = models.Signal(
-        user_id=user.id,
-        strategy_id=payload.strategy_id,
-        risk_profile_id=plan_obj.risk_profile_id,
-        market=payload.market,
-        symbol=payload.symbol,
-        timeframe=payload.timeframe,
-        direction=payload.direction,
-        status="new",
-        entry_price=payload.entry_price,
-        stop_loss=payload.stop_loss,
-        take_profit=payload.take_profit,
-        rationale="Committed via /engine/commit",
-        raw_data_json="{}",
-        risk_amount=plan_obj.risk_amount,
-        stop_distance=plan_obj.stop_distance,
-        position_size_units=plan_obj.position_size_units,
-    )
-    db.add(sig)
-    db.commit()
-    db.refresh(sig)
-
-    draft = models.TradeJournalEntry(
-        user_id=user.id,
-        signal_id=sig.id,
-        market=sig.market,
-        symbol=sig.symbol,
-        timeframe=sig.timeframe,
-        direction=sig.direction,
-        entry_price=sig.entry_price,
-        exit_price=None,
-        stop_loss=sig.stop_loss,
-        take_profit=sig.take_profit,
-        pnl=None,
-        rr=plan_obj.rr,
-        notes="DRAFT: created by /engine/commit. Fill after trade closes.",
-        emotion=None,
-        grade=None,
-        adherence_score=None,
-        is_finalized=False,
-        closed_at=None,
-        pnl_calc_mode=None,
-        used_risk_profile_id=None,
-    )
-    db.add(draft)
-    db.commit()
-    db.refresh(draft)
-
-    req_json = json.dumps(payload.model_dump(), ensure_ascii=False, default=str)
-    resp_json = json.dumps(plan_obj.model_dump(), ensure_ascii=False, default=str)
-
-    audit = models.AuditLog(
-        user_id=user.id,
-        action="engine.commit",
-        entity_type="signal",
-        entity_id=sig.id,
-        request_json=req_json,
-        response_json=resp_json,
-        created_at=datetime.utcnow(),
-    )
-    db.add(audit)
-    db.commit()
-    db.refresh(audit)
+    # Signal and journal draft (and the audit row in sync mode) are one unit of work: flush for ids, commit once.
+    # created_at is set client-side so the response needs no refresh round trips.
+    with timer.gate("write"):
+        now = datetime.utcnow()
+        sig = models.Signal(
+            user_id=user.id,
+            strategy_id=payload.strategy_id,
+            risk_profile_id=plan_obj.risk_profile_id,
+            market=payload.market,
+            symbol=payload.symbol,
+            timeframe=payload.timeframe,
+            direction=payload.direction,
+            status="new",
+            entry_price=payload.entry_price,
+            stop_loss=payload.stop_loss,
+            take_profit=payload.take_profit,
+            rationale="Committed via /engine/commit",
+            raw_data_json="{}",
+            risk_amount=plan_obj.risk_amount,
+            stop_distance=plan_obj.stop_distance,
+            position_size_units=plan_obj.position_size_units,
+            created_at=now,
+        )
+        db.add(sig)
+        db.flush()
+
+        draft = models.TradeJournalEntry(
+            user_id=user.id,
+            signal_id=sig.id,
+            market=sig.market,
+            symbol=sig.symbol,
+            timeframe=sig.timeframe,
+            direction=sig.direction,
+            entry_price=sig.entry_price,
+            exit_price=None,
+            stop_loss=sig.stop_loss,
+            take_profit=sig.take_profit,
+            pnl=None,
+            rr=plan_obj.rr,
+            notes="DRAFT: created by /engine/commit. Fill after trade closes.",
+            emotion=None,
+            grade=None,
+            adherence_score=None,
+            is_finalized=False,
+            closed_at=None,
+            pnl_calc_mode=None,
+            used_risk_profile_id=None,
+            created_at=now,
+        )
+        db.add(draft)
+
+        audit_rec = AuditRecord(
+            user_id=user.id,
+            action="engine.commit",
+            entity_type="signal",
+            entity_id=sig.id,
+            request=payload,
+            response=plan_obj,
+            created_at=now,
+        )
+        audit_id = None
+        if not settings.AUDIT_ASYNC:
+            audit_id = write_audit(db, audit_rec)  # flushes draft too
+        else:
+            db.flush()
+
+    # Build the response before commit: commit expires the instances and would reload them.
+    result = schemas.EngineCommitResponse(plan=plan_obj, signal=sig, journal_draft=draft, audit_id=audit_id)
+    with timer.gate("db_commit"):
+        db.commit()
 
-    return schemas.EngineCommitResponse(plan=plan_obj, signal=sig, journal_draft=draft, audit_id=audit.id)
+    # Enqueue only once the signal is durable; fall back to an inline insert if the writer is down or full.
+    with timer.gate("audit"):
+        if settings.AUDIT_ASYNC and not audit_writer.submit(audit_rec):
+            result.audit_id = write_audit(db, audit_rec)
+            db.commit()
+    _set_server_timing(response, plan_timer, timer)
+    return result
 
-@router.get("/audit/me", response_model=list[schemas.AuditLogOut])
-def audit_me(limit: int = 50, offset: int = 0, db: Session = Depends(get_db), user: models.User = Depends(get_current_user)):
-    q = db.query(models.AuditLog).filter(models.AuditLog.user_id == user.id).order_by(models.AuditLog.id.desc())
-    return q.offset(offset).limit(limit).all()
+def audit_page(
+    db: Session,
+    user_id: int | None,
+    limit: int,
+    cursor: str | None,
+    action: str | None,
+    entity_type: str | None,
+    created_from: datetime | None,
+    created_to: datetime | None,
+) -> schemas.AuditLogPage:
+    """Keyset page over AuditLog ordered by id desc; the cursor is the last id returned.
+
+    When the hot table runs out before the page is full, the page continues into the
+    archived segments (all archived ids are below the hot ones).
+    """
+    created_from, created_to = as_utc_naive(created_from), as_utc_naive(created_to)
+    before_id = decode_id_cursor(cursor)
+
+    q = db.query(models.AuditLog)
+    if user_id is not None:
+        q = q.filter(models.AuditLog.user_id == user_id)
+    if action is not None:
+        q = q.filter(models.AuditLog.action == action)
+    if entity_type is not None:
+        q = q.filter(models.AuditLog.entity_type == entity_type)
+    if created_from is not None:
+        q = q.filter(models.AuditLog.created_at >= created_from)
+    if created_to is not None:
+        q = q.filter(models.AuditLog.created_at < created_to)
+    if before_id is not None:
+        q = q.filter(models.AuditLog.id < before_id)
+
+    rows = q.order_by(models.AuditLog.id.desc()).limit(limit + 1).all()
+    items: list = [schemas.AuditLogOut.model_validate(r) for r in rows]
+    if len(items) <= limit:
+        archive_before = items[-1].id if items else before_id
+        archived = read_archived(archive_before, limit + 1 - len(items), user_id, action, entity_type, created_from, created_to)
+        items.extend(schemas.AuditLogOut.model_validate(r) for r in archived)
+
+    next_cursor = encode_cursor(items[limit - 1].id) if len(items) > limit else None
+    return schemas.AuditLogPage(items=items[:limit], next_cursor=next_cursor)
+
+@router.get("/audit/me", response_model=schemas.AuditLogPage)
+def audit_me(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    action: Optional[str] = None,
+    entity_type: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    db: Session = Depends(get_db),
+    user: Principal = Depends(get_current_user),
+):
+    return audit_page(db, user.id, limit, cursor, action, entity_type, created_from, created_to)
+
+@router.get("/audit", response_model=schemas.AuditLogPage)
+def audit_all(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    action: Optional[str] = None,
+    entity_type: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    user_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    user: Principal = Depends(get_current_user),
+):
+    if not is_admin(user):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return audit_page(db, user_id, limit, cursor, action, entity_type, created_from, created_to)
 
-@router.get("/audit", response_model=list[schemas.AuditLogOut])
-def audit_all(limit: int = 50, offset: int = 0, db: Session = Depends(get_db), user: models.User = Depends(get_current_user)):
+@router.post("/audit/archive")
+def audit_archive(older_than_days: Optional[int] = Query(None, ge=0), db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
     if not is_admin(user):
         raise HTTPException(status_code=403, detail="Admin access required")
-    q = db.query(models.AuditLog).order_by(models.AuditLog.id.desc())
-    return q.offset(offset).limit(limit).all()
\ No newline at end of file
+    return archive_audit_logs(db, older_than_days=older_than_days)
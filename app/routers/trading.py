@@ -1,46 +1,693 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from pydantic import ValidationError
+from sqlalchemy import insert, select, update
 from sqlalchemy.orm import Session
+from collections import defaultdict
+from dataclasses import asdict
 from datetime import datetime, timezone
+from typing import Callable
+import csv
+import io
+import json
+
+import numpy as np
 
 from app.database import get_db
 from app import models, schemas
 from app.core.security import get_current_user
+from app.core.principal_cache import Principal
+from app.core.plan_cache import plan_cache
+from app.core.lockout_index import DailyState, lockout_index
+from app.core.daily_metrics import apply_trade_results, daily_loss_limit
+from app.core.strategy_stats import apply_strategy_results
+from app.core.journal_analytics import journal_analytics
+from app.core.symbol_specs import SymbolSpecSnapshot, symbol_spec_registry
+from app.core.pnl import compute_pnl_hybrid
+from app.core.pnl_backfill import recompute_pnl
+from app.core.export import export_response
+from app.core.config import settings
+from app.core.pagination import as_utc_naive, keyset_page
+from app.routers.engine import calc_rr, calc_rr_vec
+from app.core.strategy_rules import RulesError, compile_rules
 
 router = APIRouter(prefix="/trading", tags=["trading"])
 
-def is_admin(user: models.User) -> bool:
+def is_admin(user: Principal) -> bool:
     return user.role is not None and user.role.name == "admin"
 
+def utc_day_str() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+def get_default_risk_profile(db: Session, user_id: int):
+    rp = db.query(models.RiskProfile).filter(
+        models.RiskProfile.user_id == user_id,
+        models.RiskProfile.is_default == True
+    ).first()
+    if rp:
+        return rp
+    return db.query(models.RiskProfile).filter(models.RiskProfile.user_id == user_id).first()
+
+def resolve_risk_profile_for_entry(db: Session, user_id: int, signal: models.Signal | None):
+    # prefer signal.risk_profile_id, else default
+    if signal and signal.risk_profile_id:
+        rp = db.query(models.RiskProfile).filter(models.RiskProfile.id == signal.risk_profile_id).first()
+        if rp and rp.user_id == user_id:
+            return rp
+    return get_default_risk_profile(db, user_id)
+
+def auto_grade(adherence_score: int | None, rr: float | None, pnl: float | None):
+    # simple, deterministic, upgrade later
+    score = adherence_score if adherence_score is not None else 9
+    if pnl is not None and pnl < 0:
+        # losing trades can still be A if followed plan, but cap a bit
+        score = min(score, 8)
+
+    if score >= 9:
+        return "A", score
+    if score >= 7:
+        return "B", score
+    if score >= 5:
+        return "C", score
+    return "D", score
+
 # Strategy CRUD
 @router.post("/strategies", response_model=schemas.StrategyTemplateOut)
-def create_strategy(payload: schemas.StrategyTemplateCreate, db: Session = Depends(get_db), user: models.User = Depends(get_current_user)):
+def create_strategy(payload: schemas.StrategyTemplateCreate, db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
+    try:
+        compile_rules(payload.rules_json)
+    except RulesError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid rules_json: {e}")
     st = models.StrategyTemplate(user_id=user.id, **payload.model_dump())
     db.add(st)
     db.commit()
     db.refresh(st)
+    plan_cache.bump(user.id)
     return st
 
-@router.get("/strategies", response_model=list[schemas.StrategyTemplateOut])
-def list_strategies(db: Session = Depends(get_db), user: models.User = Depends(get_current_user)):
-    return db.query(models.StrategyTemplate).filter(models.StrategyTemplate.user_id == user.id).order_by(models.StrategyTemplate.id.desc()).all()
+def _created_range(q, model, created_from: datetime | None, created_to: datetime | None):
+    # created_at in [created_from, created_to)
+    if created_from is not None:
+        q = q.filter(model.created_at >= as_utc_naive(created_from))
+    if created_to is not None:
+        q = q.filter(model.created_at < as_utc_naive(created_to))
+    return q
+
+@router.get("/strategies", response_model=schemas.StrategyTemplatePage)
+def list_strategies(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    db: Session = Depends(get_db),
+    user: Principal = Depends(get_current_user),
+):
+    q = db.query(models.StrategyTemplate).filter(models.StrategyTemplate.user_id == user.id)
+    q = _created_range(q, models.StrategyTemplate, created_from, created_to)
+    items, next_cursor = keyset_page(q, models.StrategyTemplate, limit, cursor, schemas.StrategyTemplateOut)
+    return schemas.StrategyTemplatePage(items=items, next_cursor=next_cursor)
+
+@router.get("/strategies/stats", response_model=list[schemas.StrategyStatOut])
+def list_strategy_stats(db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
+    return db.query(models.StrategyStat).filter(models.StrategyStat.user_id == user.id).order_by(models.StrategyStat.strategy_id).all()
 
 # Risk Profile CRUD
 @router.post("/risk-profiles", response_model=schemas.RiskProfileOut)
-def create_risk_profile(payload: schemas.RiskProfileCreate, db: Session = Depends(get_db), user: models.User = Depends(get_current_user)):
+def create_risk_profile(payload: schemas.RiskProfileCreate, db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
     if payload.is_default:
         db.query(models.RiskProfile).filter(models.RiskProfile.user_id == user.id).update({"is_default": False})
     rp = models.RiskProfile(user_id=user.id, **payload.model_dump())
     db.add(rp)
     db.commit()
     db.refresh(rp)
+    plan_cache.bump(user.id)
     return rp
 
-@router.get("/risk-profiles", response_model=list[schemas.RiskProfileOut])
-def list_risk_profiles(db: Session = Depends(get_db), user: models.User = Depends(get_current_user)):
-    return db.query(models.RiskProfile).filter(models.RiskProfile.user_id == user.id).order_by(models.RiskProfile.id.desc()).all()
+@router.get("/risk-profiles", response_model=schemas.RiskProfilePage)
+def list_risk_profiles(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    db: Session = Depends(get_db),
+    user: Principal = Depends(get_current_user),
+):
+    q = db.query(models.RiskProfile).filter(models.RiskProfile.user_id == user.id)
+    q = _created_range(q, models.RiskProfile, created_from, created_to)
+    items, next_cursor = keyset_page(q, models.RiskProfile, limit, cursor, schemas.RiskProfileOut)
+    return schemas.RiskProfilePage(items=items, next_cursor=next_cursor)
+
+# Signals
+@router.get("/signals", response_model=schemas.SignalPage)
+def list_signals(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str | None = None,
+    status: str | None = None,
+    market: str | None = None,
+    symbol: str | None = None,
+    timeframe: str | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    db: Session = Depends(get_db),
+    user: Principal = Depends(get_current_user),
+):
+    S = models.Signal
+    q = db.query(S).filter(S.user_id == user.id)
+    for col, value in ((S.status, status), (S.market, market), (S.symbol, symbol), (S.timeframe, timeframe)):
+        if value is not None:
+            q = q.filter(col == value)
+    q = _created_range(q, S, created_from, created_to)
+    items, next_cursor = keyset_page(q, S, limit, cursor, schemas.SignalOut)
+    return schemas.SignalPage(items=items, next_cursor=next_cursor)
+
+@router.get("/signals/export")
+def export_signals(
+    fmt: str = Query("csv", alias="format", pattern="^(csv|jsonl)$"),
+    status: str | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    user: Principal = Depends(get_current_user),
+):
+    S = models.Signal
+    stmt = select(*_export_columns(S, schemas.SignalOut)).where(S.user_id == user.id)
+    if status is not None:
+        stmt = stmt.where(S.status == status)
+    if created_from is not None:
+        stmt = stmt.where(S.created_at >= as_utc_naive(created_from))
+    if created_to is not None:
+        stmt = stmt.where(S.created_at < as_utc_naive(created_to))
+    return export_response(stmt.order_by(S.id), fmt, "signals")
+
+# status transitions (same rules you proved)
+SIGNAL_TRANSITIONS = {
+    "new": {"triggered", "cancelled"},
+    "triggered": {"executed", "cancelled"},
+    "executed": {"closed", "cancelled"},
+    "closed": set(),
+    "cancelled": set(),
+}
+
+def signal_transition_error(curr: str, nxt: str) -> str | None:
+    if nxt != curr and nxt not in SIGNAL_TRANSITIONS.get(curr, set()):
+        return f"Invalid status transition: {curr} -> {nxt}"
+    return None
+
+@router.patch("/signals/{signal_id}", response_model=schemas.SignalOut)
+def update_signal(signal_id: int, payload: schemas.SignalUpdate, db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
+    sig = db.query(models.Signal).filter(models.Signal.id == signal_id).first()
+    if not sig or (sig.user_id != user.id and not is_admin(user)):
+        raise HTTPException(status_code=404, detail="Signal not found")
+
+    updates = payload.model_dump(exclude_unset=True)
+
+    if "status" in updates:
+        curr = sig.status
+        nxt = updates["status"]
+        error = signal_transition_error(curr, nxt)
+        if error:
+            raise HTTPException(status_code=400, detail=error)
+        if nxt != curr:
+            db.add(models.SignalEvent(signal_id=sig.id, user_id=sig.user_id, actor_id=user.id, from_status=curr, to_status=nxt, source="patch"))
+
+    for k, v in updates.items():
+        setattr(sig, k, v)
+
+    db.commit()
+    db.refresh(sig)
+    return sig
+
+@router.post("/signals/transitions", response_model=schemas.SignalBulkTransitionResponse)
+def bulk_transition_signals(payload: schemas.SignalBulkTransitionRequest, db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
+    """Apply many status transitions in one transaction; each item succeeds or fails on its own.
+
+    Items are applied in order, so one batch may walk a signal through several states.
+    Signals are read with one IN query, statuses written with one executemany UPDATE and
+    the transitions appended to signal_events with one executemany INSERT.
+    """
+    S = models.Signal
+    q = db.query(S.id, S.user_id, S.status).filter(S.id.in_({it.signal_id for it in payload.items}))
+    if not is_admin(user):
+        q = q.filter(S.user_id == user.id)
+    rows = q.all()
+    owner = {sid: uid for sid, uid, _ in rows}
+    status = {sid: st for sid, _, st in rows}
+
+    results: list[schemas.SignalTransitionResult] = []
+    events: list[dict] = []
+    now = datetime.now(timezone.utc)
+    for it in payload.items:
+        curr = status.get(it.signal_id)
+        if it.signal_id not in owner:
+            error = "Signal not found"
+        else:
+            error = signal_transition_error(curr, it.status)
+        if error:
+            results.append(schemas.SignalTransitionResult(signal_id=it.signal_id, ok=False, from_status=curr, to_status=it.status, error=error))
+            continue
+        results.append(schemas.SignalTransitionResult(signal_id=it.signal_id, ok=True, from_status=curr, to_status=it.status))
+        if it.status != curr:
+            events.append({
+                "signal_id": it.signal_id,
+                "user_id": owner[it.signal_id],
+                "actor_id": user.id,
+                "from_status": curr,
+                "to_status": it.status,
+                "source": "bulk",
+                "created_at": now,
+            })
+            status[it.signal_id] = it.status
+
+    if events:
+        changed = {e["signal_id"] for e in events}
+        db.execute(update(S), [{"id": sid, "status": status[sid], "updated_at": now} for sid in changed])
+        db.execute(insert(models.SignalEvent), events)
+        db.commit()
+
+    applied = sum(r.ok for r in results)
+    return schemas.SignalBulkTransitionResponse(applied=applied, failed=len(results) - applied, results=results)
+
+@router.get("/signals/{signal_id}/events", response_model=list[schemas.SignalEventOut])
+def list_signal_events(signal_id: int, db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
+    sig = db.query(models.Signal.user_id).filter(models.Signal.id == signal_id).first()
+    if not sig or (sig.user_id != user.id and not is_admin(user)):
+        raise HTTPException(status_code=404, detail="Signal not found")
+    return db.query(models.SignalEvent).filter(models.SignalEvent.signal_id == signal_id).order_by(models.SignalEvent.id).all()
+# Journal CRUD + Finalize (Phase 4.4)
+@router.post("/journal", response_model=schemas.TradeJournalOut)
+def create_journal(payload: schemas.TradeJournalCreate, db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
+    j = models.TradeJournalEntry(user_id=user.id, is_finalized=False, **payload.model_dump())
+    db.add(j)
+    db.commit()
+    db.refresh(j)
+    return j
+
+@router.get("/journal", response_model=schemas.TradeJournalPage)
+def list_journal(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str | None = None,
+    finalized: bool | None = None,
+    market: str | None = None,
+    symbol: str | None = None,
+    timeframe: str | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    closed_from: datetime | None = None,
+    closed_to: datetime | None = None,
+    db: Session = Depends(get_db),
+    user: Principal = Depends(get_current_user),
+):
+    T = models.TradeJournalEntry
+    q = db.query(T).filter(T.user_id == user.id)
+    if finalized is not None:
+        q = q.filter(T.is_finalized == finalized)
+    for col, value in ((T.market, market), (T.symbol, symbol), (T.timeframe, timeframe)):
+        if value is not None:
+            q = q.filter(col == value)
+    q = _created_range(q, T, created_from, created_to)
+    # closed_at in [closed_from, closed_to)
+    if closed_from is not None:
+        q = q.filter(T.closed_at >= as_utc_naive(closed_from))
+    if closed_to is not None:
+        q = q.filter(T.closed_at < as_utc_naive(closed_to))
+    items, next_cursor = keyset_page(q, T, limit, cursor, schemas.TradeJournalOut)
+    return schemas.TradeJournalPage(items=items, next_cursor=next_cursor)
+
+def _export_columns(model, out_schema):
+    # same fields as the list endpoints, selected as plain columns
+    return [getattr(model, f) for f in out_schema.model_fields]
+
+@router.get("/journal/export")
+def export_journal(
+    fmt: str = Query("csv", alias="format", pattern="^(csv|jsonl)$"),
+    finalized: bool | None = None,
+    symbol: str | None = None,
+    closed_from: datetime | None = None,
+    closed_to: datetime | None = None,
+    user: Principal = Depends(get_current_user),
+):
+    T = models.TradeJournalEntry
+    stmt = select(*_export_columns(T, schemas.TradeJournalOut)).where(T.user_id == user.id)
+    if finalized is not None:
+        stmt = stmt.where(T.is_finalized == finalized)
+    if symbol is not None:
+        stmt = stmt.where(T.symbol == symbol)
+    if closed_from is not None:
+        stmt = stmt.where(T.closed_at >= as_utc_naive(closed_from))
+    if closed_to is not None:
+        stmt = stmt.where(T.closed_at < as_utc_naive(closed_to))
+    return export_response(stmt.order_by(T.id), fmt, "journal")
+
+@router.get("/journal/analytics", response_model=schemas.JournalAnalyticsOut)
+def get_journal_analytics(
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    window: int = Query(20, ge=1, le=500),
+    db: Session = Depends(get_db),
+    user: Principal = Depends(get_current_user),
+):
+    # closed_at in [date_from, date_to)
+    return journal_analytics(db, user.id, date_from, date_to, window)
+
+# Bulk import of trade history (CSV / JSONL)
+MAX_IMPORT_ERRORS = 100
+
+def _iter_import_rows(upload: UploadFile, fmt: str):
+    """Yield (line_no, dict | error message) while reading the upload line by line."""
+    text = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for row in reader:
+            # empty cells are missing values; drop extra unnamed columns
+            yield reader.line_num, {k: v for k, v in row.items() if k and v not in (None, "")}
+        return
+    for line_no, line in enumerate(text, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            obj = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_no, f"invalid JSON ({e.msg})"
+            continue
+        if not isinstance(obj, dict):
+            yield line_no, "expected a JSON object"
+            continue
+        yield line_no, obj
+
+def _validate_import_row(raw: dict | str) -> tuple[schemas.JournalImportRow | None, str | None]:
+    if isinstance(raw, str):
+        return None, raw
+    try:
+        row = schemas.JournalImportRow.model_validate(raw)
+    except ValidationError as e:
+        err = e.errors()[0]
+        return None, f"{'.'.join(str(x) for x in err['loc'])}: {err['msg']}"
+    row.direction = row.direction.lower()
+    if row.direction not in ("long", "short"):
+        return None, "direction must be 'long' or 'short'"
+    if row.pnl is None and (row.entry_price is None or row.exit_price is None):
+        return None, "Provide exit_price and entry_price (or pnl)"
+    return row, None
+
+def _nan_array(values) -> np.ndarray:
+    return np.array([np.nan if v is None else v for v in values], dtype=float)
+
+def _import_chunk(
+    db: Session,
+    user_id: int,
+    rp: models.RiskProfile | None,
+    rows: list[tuple[int, schemas.JournalImportRow]],
+    specs: dict[tuple[str, str], SymbolSpecSnapshot],
+    day_pnls: dict[str, list],
+) -> int:
+    """Compute rr/pnl/grade for a validated chunk and insert it with one executemany."""
+    entry = _nan_array(r.entry_price for _, r in rows)
+    rr = calc_rr_vec(
+        "long", entry, _nan_array(r.stop_loss for _, r in rows), _nan_array(r.take_profit for _, r in rows)
+    )
+    rr = np.where(np.array([r.direction == "short" for _, r in rows]), -rr, rr)
+
+    values = []
+    for (line_no, r), rr_val in zip(rows, rr.tolist()):
+        rr_val = None if np.isnan(rr_val) else round(rr_val, 4)
+        if r.pnl is not None:
+            pnl, mode = float(r.pnl), "manual"
+        else:
+            pnl, mode = compute_pnl_hybrid(r.direction, r.entry_price, r.exit_price, r.units, specs.get((r.market, r.symbol)))
+            pnl = round(pnl, 2)
+        grade, score = auto_grade(r.adherence_score, rr_val, pnl)
+        closed_at = as_utc_naive(r.closed_at)
+        values.append({
+            "user_id": user_id,
+            "signal_id": None,
+            "market": r.market,
+            "symbol": r.symbol,
+            "timeframe": r.timeframe,
+            "direction": r.direction,
+            "entry_price": r.entry_price,
+            "exit_price": r.exit_price,
+            "stop_loss": r.stop_loss,
+            "take_profit": r.take_profit,
+            "pnl": pnl,
+            "rr": rr_val,
+            "notes": r.notes,
+            "emotion": r.emotion,
+            "grade": grade,
+            "adherence_score": score,
+            "is_finalized": True,
+            "closed_at": closed_at,
+            "pnl_calc_mode": mode,
+            "used_risk_profile_id": rp.id if rp else None,
+            "position_size_units": r.units,
+        })
+        day_pnls[closed_at.strftime("%Y-%m-%d")].append((closed_at, line_no, pnl))
+    db.execute(insert(models.TradeJournalEntry), values)
+    return len(values)
+
+@router.post("/journal/import", response_model=schemas.JournalImportResult)
+def import_journal(
+    file: UploadFile = File(...),
+    fmt: str | None = Query(None, alias="format", pattern="^(csv|jsonl)$"),
+    skip_invalid: bool = False,
+    db: Session = Depends(get_db),
+    user: Principal = Depends(get_current_user),
+):
+    """Import finalized trades in one transaction; daily metrics are rolled up once per day.
+
+    Any invalid row aborts the import with 422 unless skip_invalid is set.
+    """
+    if fmt is None:
+        fmt = "jsonl" if (file.filename or "").lower().endswith((".jsonl", ".ndjson")) else "csv"
+    rp = get_default_risk_profile(db, user.id)
+    specs = {(s.market, s.symbol): s for s in symbol_spec_registry.all(db)}
+
+    imported, skipped = 0, 0
+    errors: list[schemas.JournalImportError] = []
+    chunk: list[tuple[int, schemas.JournalImportRow]] = []
+    day_pnls: dict[str, list] = defaultdict(list)
+    for line_no, raw in _iter_import_rows(file, fmt):
+        if imported + skipped + len(chunk) >= settings.JOURNAL_IMPORT_MAX_ROWS:
+            db.rollback()
+            raise HTTPException(status_code=413, detail=f"Import is limited to {settings.JOURNAL_IMPORT_MAX_ROWS} rows")
+        row, error = _validate_import_row(raw)
+        if error:
+            skipped += 1
+            if len(errors) < MAX_IMPORT_ERRORS:
+                errors.append(schemas.JournalImportError(line=line_no, error=error))
+            continue
+        chunk.append((line_no, row))
+        if len(chunk) >= settings.JOURNAL_IMPORT_CHUNK_ROWS:
+            imported += _import_chunk(db, user.id, rp, chunk, specs, day_pnls)
+            chunk = []
+    if chunk:
+        imported += _import_chunk(db, user.id, rp, chunk, specs, day_pnls)
+
+    if errors and not skip_invalid:
+        db.rollback()
+        raise HTTPException(status_code=422, detail=[e.model_dump() for e in errors])
+
+    # one upsert per affected day, trades in close order
+    today, today_state = utc_day_str(), None
+    loss_limit = daily_loss_limit(rp)
+    for day in sorted(day_pnls):
+        state = apply_trade_results(db, user.id, day, [pnl for _, _, pnl in sorted(day_pnls[day])], loss_limit)
+        if day == today:
+            today_state = state
+    db.commit()
+
+    if today_state is not None:
+        lockout_index.put(user.id, today, today_state)
+    plan_cache.bump(user.id)
+    return schemas.JournalImportResult(imported=imported, skipped=skipped, days_updated=len(day_pnls), errors=errors)
+
+def close_entry(
+    j: models.TradeJournalEntry,
+    payload: schemas.JournalFinalizeRequest,
+    sig: models.Signal | None,
+    rp: models.RiskProfile | None,
+    get_spec: Callable[[str, str], SymbolSpecSnapshot | None],
+):
+    """Apply a finalize request to an open entry; raises before touching it if pnl can't be computed."""
+    # Must have entry + exit to compute (unless pnl supplied)
+    entry = j.entry_price
+    exit_price = payload.exit_price if payload.exit_price is not None else j.exit_price
+    if payload.pnl is None and (entry is None or exit_price is None):
+        raise HTTPException(status_code=400, detail="Provide exit_price (or pnl) to finalize")
+
+    # Apply optional updates
+    if payload.notes is not None:
+        j.notes = payload.notes
+    if payload.emotion is not None:
+        j.emotion = payload.emotion
+    if payload.exit_price is not None:
+        j.exit_price = payload.exit_price
+
+    # Compute rr if possible
+    if j.rr is None and j.entry_price is not None and j.stop_loss is not None and j.take_profit is not None:
+        rr_val = calc_rr(j.direction, j.entry_price, j.stop_loss, j.take_profit)
+        if rr_val is not None:
+            j.rr = float(round(rr_val, 4))
+
+    # PnL: hybrid
+    if payload.pnl is not None:
+        j.pnl = float(payload.pnl)
+        j.pnl_calc_mode = "manual"
+    else:
+        units = sig.position_size_units if sig and sig.position_size_units is not None else None
+        pnl_val, mode = compute_pnl_hybrid(j.direction, float(entry), float(exit_price), units, get_spec(j.market, j.symbol))
+        j.pnl = float(round(pnl_val, 2))
+        j.pnl_calc_mode = mode
+
+    # Auto grade/adherence (placeholder deterministic rules)
+    grade, score = auto_grade(j.adherence_score, j.rr, j.pnl)
+    j.grade = grade
+    j.adherence_score = score
+
+    # finalize
+    j.is_finalized = True
+    j.closed_at = datetime.now(timezone.utc)
+    if rp:
+        j.used_risk_profile_id = rp.id
+
+@router.post("/journal/{journal_id}/finalize", response_model=schemas.TradeJournalOut)
+def finalize_journal(journal_id: int, payload: schemas.JournalFinalizeRequest, db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
+    j = db.query(models.TradeJournalEntry).filter(models.TradeJournalEntry.id == journal_id).first()
+    if not j or (j.user_id != user.id and not is_admin(user)):
+        raise HTTPException(status_code=404, detail="Journal entry not found")
+
+    if j.is_finalized:
+        raise HTTPException(status_code=400, detail="Journal already finalized")
+
+    # Resolve linked signal (for units + rp)
+    sig = None
+    if j.signal_id:
+        sig = db.query(models.Signal).filter(models.Signal.id == j.signal_id).first()
+
+    rp = resolve_risk_profile_for_entry(db, j.user_id, sig)
+    close_entry(
+        j, payload, sig, rp,
+        lambda market, symbol: symbol_spec_registry.get(db, market, symbol),
+    )
+
+    # Daily metrics + lockout: one atomic upsert (pnl, trade count, loss streak, lockout)
+    # that hands back the post-update row.
+    day = utc_day_str()
+    state = apply_trade_results(db, j.user_id, day, [float(j.pnl or 0.0)], daily_loss_limit(rp))
+    if sig and sig.strategy_id:
+        apply_strategy_results(db, j.user_id, sig.strategy_id, [(float(j.pnl or 0.0), j.rr)])
+
+    out = schemas.TradeJournalOut.model_validate(j)
+    db.commit()
+    lockout_index.put(j.user_id, day, state)
+    plan_cache.bump(j.user_id)
+    return out
+
+@router.post("/journal/finalize", response_model=schemas.JournalBulkFinalizeResult)
+def bulk_finalize_journal(
+    payload: schemas.JournalBulkFinalizeRequest,
+    skip_invalid: bool = False,
+    db: Session = Depends(get_db),
+    user: Principal = Depends(get_current_user),
+):
+    """Finalize many entries in one transaction.
+
+    Entries, signals and risk profiles are prefetched with one IN query each (symbol specs
+    come from the in-memory registry);
+    daily metrics get one delta per user and strategy stats one per (user, strategy). Any
+    failing item aborts the batch with 422 unless skip_invalid is set.
+    """
+    T = models.TradeJournalEntry
+    ids = [it.journal_id for it in payload.items]
+    if len(set(ids)) != len(ids):
+        raise HTTPException(status_code=400, detail="Duplicate journal_id in batch")
+
+    q = db.query(T).filter(T.id.in_(ids))
+    if not is_admin(user):
+        q = q.filter(T.user_id == user.id)
+    entries = {j.id: j for j in q.all()}
+
+    sig_ids = {j.signal_id for j in entries.values() if j.signal_id}
+    sigs = {s.id: s for s in db.query(models.Signal).filter(models.Signal.id.in_(sig_ids)).all()} if sig_ids else {}
+
+    # same resolution as resolve_risk_profile_for_entry: the signal's profile if owned, else the default
+    rps_by_id: dict[int, models.RiskProfile] = {}
+    default_rp: dict[int, models.RiskProfile] = {}
+    user_ids = {j.user_id for j in entries.values()}
+    if user_ids:
+        for rp in db.query(models.RiskProfile).filter(models.RiskProfile.user_id.in_(user_ids)).order_by(models.RiskProfile.id).all():
+            rps_by_id[rp.id] = rp
+            cur = default_rp.get(rp.user_id)
+            if cur is None or (rp.is_default and not cur.is_default):
+                default_rp[rp.user_id] = rp
+
+    finalized: list[schemas.TradeJournalOut] = []
+    errors: list[schemas.JournalBulkFinalizeError] = []
+    user_pnls: dict[int, list[float]] = defaultdict(list)
+    user_limits: dict[int, list[float]] = defaultdict(list)
+    strategy_results: dict[tuple[int, int], list] = defaultdict(list)
+    for item in payload.items:
+        j = entries.get(item.journal_id)
+        if j is None:
+            errors.append(schemas.JournalBulkFinalizeError(journal_id=item.journal_id, error="Journal entry not found"))
+            continue
+        if j.is_finalized:
+            errors.append(schemas.JournalBulkFinalizeError(journal_id=j.id, error="Journal already finalized"))
+            continue
+        sig = sigs.get(j.signal_id)
+        rp = rps_by_id.get(sig.risk_profile_id) if sig and sig.risk_profile_id else None
+        if rp is None or rp.user_id != j.user_id:
+            rp = default_rp.get(j.user_id)
+        try:
+            close_entry(j, item, sig, rp, lambda market, symbol: symbol_spec_registry.get(db, market, symbol))
+        except HTTPException as e:
+            errors.append(schemas.JournalBulkFinalizeError(journal_id=j.id, error=e.detail))
+            continue
+        pnl = float(j.pnl or 0.0)
+        user_pnls[j.user_id].append(pnl)
+        limit = daily_loss_limit(rp)
+        if limit is not None:
+            user_limits[j.user_id].append(limit)
+        if sig and sig.strategy_id:
+            strategy_results[(j.user_id, sig.strategy_id)].append((pnl, j.rr))
+        finalized.append(schemas.TradeJournalOut.model_validate(j))
+
+    if errors and not skip_invalid:
+        db.rollback()
+        raise HTTPException(status_code=422, detail=[e.model_dump() for e in errors])
+
+    # entries may resolve to different risk profiles; the most restrictive loss limit applies
+    day = utc_day_str()
+    states = {
+        uid: apply_trade_results(db, uid, day, pnls, min(user_limits[uid]) if user_limits[uid] else None)
+        for uid, pnls in user_pnls.items()
+    }
+    for (uid, strategy_id), results in strategy_results.items():
+        apply_strategy_results(db, uid, strategy_id, results)
+    db.commit()
+
+    for uid, state in states.items():
+        lockout_index.put(uid, day, state)
+        plan_cache.bump(uid)
+    return schemas.JournalBulkFinalizeResult(finalized=finalized, errors=errors)
+
+@router.get("/metrics/daily/export")
+def export_daily_metrics(
+    fmt: str = Query("csv", alias="format", pattern="^(csv|jsonl)$"),
+    day_from: str | None = Query(None, pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    day_to: str | None = Query(None, pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    user: Principal = Depends(get_current_user),
+):
+    D = models.DailyMetric
+    stmt = select(*_export_columns(D, schemas.DailyMetricOut)).where(D.user_id == user.id)
+    # day in [day_from, day_to]; days are YYYY-MM-DD strings, so they compare in date order
+    if day_from is not None:
+        stmt = stmt.where(D.day >= day_from)
+    if day_to is not None:
+        stmt = stmt.where(D.day <= day_to)
+    return export_response(stmt.order_by(D.day), fmt, "daily_metrics")
+
 # Phase 4.2: User Reset Today
 @router.post("/metrics/reset-today")
-def reset_today(db: Session = Depends(get_db), user: models.User = Depends(get_current_user)):
+def reset_today(db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
     """User-facing endpoint to reset today's metrics (clears lockout + counters)"""
     from datetime import datetime, timezone
     day = datetime.now(timezone.utc).strftime("%Y-%m-%d")
@@ -67,5 +714,62 @@ def reset_today(db: Session = Depends(get_db), user: models.User = Depends(get_c
         dm.consecutive_losses = 0
     
     db.commit()
-    db.refresh(dm)
-    return {"status": "today metrics reset", "day": day}
\ No newline at end of file
+    lockout_index.put(user.id, day, DailyState())
+    plan_cache.bump(user.id)
+    return {"status": "today metrics reset", "day": day}
+
+# Symbol specs (admin-only)
+def _spec_conflict(db: Session, market: str, symbol: str, exclude_id: int | None = None) -> bool:
+    q = db.query(models.SymbolSpec.id).filter(models.SymbolSpec.market == market, models.SymbolSpec.symbol == symbol)
+    if exclude_id is not None:
+        q = q.filter(models.SymbolSpec.id != exclude_id)
+    return q.first() is not None
+
+@router.post("/symbol-specs", response_model=schemas.SymbolSpecOut)
+def create_symbol_spec(payload: schemas.SymbolSpecCreate, db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
+    if not is_admin(user):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    if _spec_conflict(db, payload.market, payload.symbol):
+        raise HTTPException(status_code=400, detail="SymbolSpec already exists for this market+symbol")
+    spec = models.SymbolSpec(**payload.model_dump())
+    db.add(spec)
+    db.commit()
+    db.refresh(spec)
+    symbol_spec_registry.reload(db)
+    return spec
+
+@router.get("/symbol-specs", response_model=list[schemas.SymbolSpecOut])
+def list_symbol_specs(db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
+    if not is_admin(user):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return sorted(symbol_spec_registry.all(db), key=lambda s: s.id, reverse=True)
+
+@router.patch("/symbol-specs/{spec_id}", response_model=schemas.SymbolSpecOut)
+def update_symbol_spec(spec_id: int, payload: schemas.SymbolSpecUpdate, db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
+    if not is_admin(user):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    spec = db.query(models.SymbolSpec).filter(models.SymbolSpec.id == spec_id).first()
+    if not spec:
+        raise HTTPException(status_code=404, detail="SymbolSpec not found")
+    changes = payload.model_dump(exclude_unset=True)
+    if changes.get("market", "") is None or changes.get("symbol", "") is None:
+        raise HTTPException(status_code=400, detail="market and symbol can not be cleared")
+    market, symbol = changes.get("market", spec.market), changes.get("symbol", spec.symbol)
+    if _spec_conflict(db, market, symbol, exclude_id=spec.id):
+        raise HTTPException(status_code=400, detail="SymbolSpec already exists for this market+symbol")
+    for key, value in changes.items():
+        setattr(spec, key, value)
+    db.commit()
+    db.refresh(spec)
+    symbol_spec_registry.reload(db)
+    return spec
+
+@router.post("/symbol-specs/{spec_id}/recompute-pnl")
+def recompute_symbol_pnl(spec_id: int, dry_run: bool = False, include_today: bool = False, db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
+    """Re-price this instrument's finalized, price-derived journal entries with the current spec."""
+    if not is_admin(user):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    spec = db.query(models.SymbolSpec).filter(models.SymbolSpec.id == spec_id).first()
+    if not spec:
+        raise HTTPException(status_code=404, detail="SymbolSpec not found")
+    return asdict(recompute_pnl(db, market=spec.market, symbol=spec.symbol, dry_run=dry_run, include_today=include_today))
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, model_validator
 from typing import Optional
 from datetime import datetime
 
@@ -17,8 +17,12 @@ class UserResponse(BaseModel):
 
 class Token(BaseModel):
     access_token: str
+    refresh_token: Optional[str] = None  # AUTH_STATELESS only
     token_type: str = "bearer"
 
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
 class RoleUpdate(BaseModel):
     role_name: str
 
@@ -46,6 +50,10 @@ class StrategyTemplateOut(BaseModel):
     class Config:
         from_attributes = True
 
+class StrategyTemplatePage(BaseModel):
+    items: list[StrategyTemplateOut]
+    next_cursor: Optional[str] = None
+
 # Risk Profile schemas
 class RiskProfileCreate(BaseModel):
     name: str
@@ -79,6 +87,10 @@ class RiskProfileOut(BaseModel):
     class Config:
         from_attributes = True
 
+class RiskProfilePage(BaseModel):
+    items: list[RiskProfileOut]
+    next_cursor: Optional[str] = None
+
 # Signal schemas
 class SignalCreate(BaseModel):
     strategy_id: Optional[int] = None
@@ -120,6 +132,41 @@ class SignalOut(BaseModel):
     class Config:
         from_attributes = True
 
+class SignalPage(BaseModel):
+    items: list[SignalOut]
+    next_cursor: Optional[str] = None
+
+class SignalTransitionItem(BaseModel):
+    signal_id: int
+    status: str
+
+class SignalBulkTransitionRequest(BaseModel):
+    items: list[SignalTransitionItem] = Field(min_length=1, max_length=1000)
+
+class SignalTransitionResult(BaseModel):
+    signal_id: int
+    ok: bool
+    from_status: Optional[str] = None
+    to_status: str
+    error: Optional[str] = None
+
+class SignalBulkTransitionResponse(BaseModel):
+    applied: int
+    failed: int
+    results: list[SignalTransitionResult]
+
+class SignalEventOut(BaseModel):
+    id: int
+    signal_id: int
+    user_id: int
+    actor_id: Optional[int]
+    from_status: Optional[str]
+    to_status: str
+    source: Optional[str]
+    created_at: datetime
+    class Config:
+        from_attributes = True
+
 # Journal schemas
 class TradeJournalCreate(BaseModel):
     signal_id: Optional[int] = None
@@ -161,10 +208,57 @@ class TradeJournalOut(BaseModel):
     is_finalized: bool
     closed_at: Optional[datetime]
     pnl_calc_mode: Optional[str]
+    position_size_units: Optional[float] = None
     created_at: datetime
     class Config:
         from_attributes = True
-        # Engine schemas
+
+class TradeJournalPage(BaseModel):
+    items: list[TradeJournalOut]
+    next_cursor: Optional[str] = None
+
+class JournalBulkFinalizeItem(JournalFinalizeRequest):
+    journal_id: int
+
+class JournalBulkFinalizeRequest(BaseModel):
+    items: list[JournalBulkFinalizeItem] = Field(min_length=1, max_length=1000)
+
+class JournalBulkFinalizeError(BaseModel):
+    journal_id: int
+    error: str
+
+class JournalBulkFinalizeResult(BaseModel):
+    finalized: list[TradeJournalOut]
+    errors: list[JournalBulkFinalizeError]
+
+class JournalImportRow(BaseModel):
+    # one row of an imported trade history (CSV header / JSONL keys); imported rows are finalized
+    market: str
+    symbol: str
+    timeframe: str
+    direction: str
+    entry_price: Optional[float] = None
+    exit_price: Optional[float] = None
+    stop_loss: Optional[float] = None
+    take_profit: Optional[float] = None
+    units: Optional[float] = None  # position size, stored; used to compute pnl when pnl is missing
+    pnl: Optional[float] = None
+    closed_at: datetime
+    notes: Optional[str] = None
+    emotion: Optional[str] = None
+    adherence_score: Optional[int] = None
+
+class JournalImportError(BaseModel):
+    line: int
+    error: str
+
+class JournalImportResult(BaseModel):
+    imported: int
+    skipped: int
+    days_updated: int
+    errors: list[JournalImportError]
+
+# Engine schemas
 class EnginePlanRequest(BaseModel):
     strategy_id: Optional[int] = None
     risk_profile_id: Optional[int] = None
@@ -177,6 +271,9 @@ class EnginePlanRequest(BaseModel):
     take_profit: Optional[float] = None
     rr_min: float = 1.5
 
+class EnginePlanBatchRequest(BaseModel):
+    candidates: list[EnginePlanRequest] = Field(min_length=1, max_length=500)
+
 class EngineChecklistItem(BaseModel):
     key: str
     passed: bool
@@ -193,11 +290,96 @@ class EnginePlanResponse(BaseModel):
     checklist: list[EngineChecklistItem]
     recommendation: str
 
+class EngineSweepRange(BaseModel):
+    start: float
+    end: float
+    steps: int = Field(ge=1, le=200)
+
+class EngineSweepRequest(BaseModel):
+    risk_profile_id: Optional[int] = None
+    direction: str
+    entry_price: float
+    stop_losses: Optional[list[float]] = Field(default=None, max_length=200)
+    stop_range: Optional[EngineSweepRange] = None
+    take_profits: Optional[list[float]] = Field(default=None, max_length=200)
+    take_profit_range: Optional[EngineSweepRange] = None
+
+    @model_validator(mode="after")
+    def _one_source_per_axis(self):
+        if self.stop_losses is not None and self.stop_range is not None:
+            raise ValueError("Provide stop_losses or stop_range, not both")
+        if self.take_profits is not None and self.take_profit_range is not None:
+            raise ValueError("Provide take_profits or take_profit_range, not both")
+        return self
+
+class EngineSweepResponse(BaseModel):
+    risk_profile_id: int
+    direction: str
+    entry_price: float
+    stop_losses: list[float]
+    take_profits: list[float]
+    # one value per stop placement (None = invalid placement)
+    risk_amount: list[Optional[float]]
+    stop_distance: list[Optional[float]]
+    position_size_units: list[Optional[float]]
+    # rr[i][j] = RR for stop_losses[i] with take_profits[j]
+    rr: list[list[Optional[float]]]
+
 class EngineCommitResponse(BaseModel):
     plan: EnginePlanResponse
     signal: SignalOut
     journal_draft: TradeJournalOut
-    audit_id: int
+    audit_id: Optional[int] = None  # None when the audit row was queued for the background writer
+
+# Strategy stats schemas
+class StrategyStatOut(BaseModel):
+    strategy_id: int
+    trades: int
+    wins: int
+    losses: int
+    win_rate: Optional[float]
+    gross_pnl: float
+    gross_profit: float
+    gross_loss: float
+    avg_rr: Optional[float]
+    expectancy: Optional[float]
+    max_drawdown: float
+    updated_at: Optional[datetime]
+    class Config:
+        from_attributes = True
+
+# Journal analytics schemas
+class JournalEquityCurve(BaseModel):
+    # column-oriented: one entry per finalized trade, in close order
+    journal_ids: list[int]
+    closed_at: list[Optional[datetime]]
+    pnl: list[float]
+    equity: list[float]
+    drawdown: list[float]
+    rolling_win_rate: list[float]
+
+class RMultipleBucket(BaseModel):
+    lower: Optional[float]  # None = unbounded
+    upper: Optional[float]
+    count: int
+
+class JournalAnalyticsOut(BaseModel):
+    trades: int
+    wins: int
+    losses: int
+    win_rate: Optional[float]
+    gross_profit: float
+    gross_loss: float
+    net_pnl: float
+    profit_factor: Optional[float]
+    avg_win: Optional[float]
+    avg_loss: Optional[float]
+    expectancy: Optional[float]
+    expectancy_r: Optional[float]
+    max_drawdown: float
+    rolling_window: int
+    equity_curve: JournalEquityCurve
+    r_multiples: list[RMultipleBucket]
 
 # Daily Metric schemas
 class DailyMetricOut(BaseModel):
@@ -223,6 +405,10 @@ class AuditLogOut(BaseModel):
     class Config:
         from_attributes = True
 
+class AuditLogPage(BaseModel):
+    items: list[AuditLogOut]
+    next_cursor: Optional[str] = None  # pass back as ?cursor= for the next (older) page
+
 # Symbol Spec schemas
 class SymbolSpecCreate(BaseModel):
     market: str
@@ -234,6 +420,16 @@ class SymbolSpecCreate(BaseModel):
     tick_value: Optional[float] = None
     point_value: Optional[float] = None
 
+class SymbolSpecUpdate(BaseModel):
+    market: Optional[str] = None
+    symbol: Optional[str] = None
+    pip_size: Optional[float] = None
+    pip_value: Optional[float] = None
+    contract_size: Optional[float] = None
+    tick_size: Optional[float] = None
+    tick_value: Optional[float] = None
+    point_value: Optional[float] = None
+
 class SymbolSpecOut(BaseModel):
     id: int
     market: str
@@ -245,5 +441,6 @@ class SymbolSpecOut(BaseModel):
     tick_value: Optional[float]
     point_value: Optional[float]
     created_at: datetime
+    updated_at: Optional[datetime] = None
     class Config:
         from_attributes = True
\ No newline at end of file
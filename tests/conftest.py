@@ -0,0 +1,88 @@
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+# app.database opens ./app.db relative to the working directory: run against a scratch copy
+_workdir = tempfile.mkdtemp(prefix="thebutton-tests-")
+atexit.register(shutil.rmtree, _workdir, ignore_errors=True)
+os.chdir(_workdir)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings  # noqa: E402
+
+# cheap argon2 in the request's threadpool; the process pool and its cost are not under test
+settings.PASSWORD_HASH_WORKERS = 0
+settings.ARGON2_TIME_COST = 1
+settings.ARGON2_MEMORY_COST_KIB = 1024
+settings.ARGON2_PARALLELISM = 1
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+
+PASSWORD = "password123"
+
+
+def auth_headers(client: TestClient, email: str) -> dict:
+    client.post("/auth/register", json={"email": email, "password": PASSWORD})
+    token = client.post("/auth/login", data={"username": email, "password": PASSWORD}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture(scope="session")
+def admin(client):
+    # the first registered user is bootstrapped as admin
+    return auth_headers(client, "admin@test.com")
+
+
+@pytest.fixture(scope="session")
+def trader(client, admin):
+    return auth_headers(client, "trader@test.com")
+
+
+PLAN = {"market": "forex", "symbol": "EURUSD", "timeframe": "1h", "direction": "long", "entry_price": 1.1, "stop_loss": 1.09, "take_profit": 1.13}
+
+
+def user_id_of(email: str) -> int:
+    from app import models
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        return db.query(models.User.id).filter(models.User.email == email).scalar()
+    finally:
+        db.close()
+
+
+def new_trader(client: TestClient, email: str, **risk) -> tuple[dict, int]:
+    """A fresh user with one default risk profile; (auth headers, user id).
+
+    Tests that move a user's daily counters or lockout use their own user so they do not leak
+    into the shared `trader`.
+    """
+    headers = auth_headers(client, email)
+    profile = {"name": "default", "account_balance": 10000, "risk_per_trade_pct": 1, "max_daily_loss_pct": 3, "is_default": True, **risk}
+    assert client.post("/trading/risk-profiles", headers=headers, json=profile).status_code == 200
+    return headers, user_id_of(email)
+
+
+def open_entry(client: TestClient, headers: dict, symbol: str = "EURUSD") -> int:
+    r = client.post("/trading/journal", headers=headers, json={"market": "forex", "symbol": symbol, "timeframe": "1h", "direction": "long", "entry_price": 1.1})
+    assert r.status_code == 200, r.text
+    return r.json()["id"]
+
+
+def finalize(client: TestClient, headers: dict, journal_id: int, pnl: float):
+    r = client.post(f"/trading/journal/{journal_id}/finalize", headers=headers, json={"pnl": pnl})
+    assert r.status_code == 200, r.text
+    return r.json()
@@ -0,0 +1,55 @@
+from conftest import PLAN
+
+from app.core.plan_cache import plan_cache
+from app.core.principal_cache import principal_cache
+
+
+def _trader_id(client, trader) -> int:
+    return client.get("/users/me", headers=trader).json()["id"]
+
+
+def _plan(client, trader) -> tuple[int, int]:
+    """(hits, misses) added to the plan cache by one single-candidate batch."""
+    before = plan_cache.stats()
+    r = client.post("/engine/plan/batch", headers=trader, json={"candidates": [PLAN]})
+    assert r.status_code == 200, r.text
+    after = plan_cache.stats()
+    return after["hits"] - before["hits"], after["misses"] - before["misses"]
+
+
+def test_role_change_invalidates_principal_and_plans(client, admin, trader):
+    client.post("/trading/risk-profiles", headers=trader, json={"name": "cache", "account_balance": 10000, "risk_per_trade_pct": 1, "max_daily_loss_pct": 3})
+    user_id = _trader_id(client, trader)
+
+    # prime both caches
+    assert client.get("/admin/users", headers=trader).status_code == 403
+    assert principal_cache.get(str(user_id)).role.name == "user"
+    _plan(client, trader)
+    assert _plan(client, trader) == (1, 0)
+
+    try:
+        r = client.patch(f"/admin/users/{user_id}/role", headers=admin, json={"role_name": "admin"})
+        assert r.status_code == 200
+        assert principal_cache.get(str(user_id)) is None  # dropped, not left to expire
+
+        assert client.get("/admin/users", headers=trader).status_code == 200
+        assert principal_cache.get(str(user_id)).role.name == "admin"
+        assert _plan(client, trader) == (0, 1)  # the cached plan is unreachable after the bump
+    finally:
+        client.patch(f"/admin/users/{user_id}/role", headers=admin, json={"role_name": "user"})
+    assert client.get("/admin/users", headers=trader).status_code == 403
+
+
+def test_deactivation_invalidates_principal_and_plans(client, admin, trader):
+    user_id = _trader_id(client, trader)
+    _plan(client, trader)
+    version = plan_cache.version(user_id)
+
+    try:
+        assert client.patch(f"/admin/users/{user_id}/active", headers=admin, json={"is_active": False}).status_code == 200
+        assert plan_cache.version(user_id) == version + 1
+        assert client.get("/users/me", headers=trader).status_code == 403
+    finally:
+        client.patch(f"/admin/users/{user_id}/active", headers=admin, json={"is_active": True})
+    assert client.get("/users/me", headers=trader).status_code == 200
+    assert _plan(client, trader) == (0, 1)
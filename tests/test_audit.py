@@ -0,0 +1,73 @@
+import pytest
+
+from app.core.pagination import encode_cursor
+
+
+@pytest.mark.parametrize("cursor", [encode_cursor("abc"), encode_cursor(None), encode_cursor([]), "not-base64!"])
+def test_audit_rejects_malformed_cursor(client, admin, cursor):
+    for path in ("/engine/audit/me", "/engine/audit"):
+        r = client.get(path, headers=admin, params={"cursor": cursor})
+        assert r.status_code == 400, (path, cursor, r.text)
+        assert r.json()["detail"] == "Invalid cursor"
+
+
+def test_archived_segments_pruned_by_user(client, admin, trader):
+    from datetime import datetime, timedelta
+
+    from app import models
+    from app.core import audit_archive
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        admin_id = db.query(models.User.id).filter(models.User.email == "admin@test.com").scalar()
+        old = datetime.utcnow() - timedelta(days=400)
+        db.add_all([models.AuditLog(user_id=admin_id, action="test.old", entity_type="test", created_at=old) for _ in range(5)])
+        db.add(models.AuditLog(user_id=admin_id, action="test.new", entity_type="test"))
+        db.commit()
+    finally:
+        db.close()
+
+    assert client.post("/engine/audit/archive", headers=admin, params={"older_than_days": 300}).json()["rows"] >= 5
+    seg = audit_archive.load_index()[-1]
+    assert admin_id in seg["user_ids"] and "test.old" in seg["actions"]
+    assert audit_archive.load_index() is audit_archive.load_index()  # served from the cache
+
+    audit_archive._segment_columns.cache_clear()
+    r = client.get("/engine/audit/me", headers=trader)
+    assert r.status_code == 200
+    assert audit_archive._segment_columns.cache_info().misses == 0  # no segment holds the trader's rows
+
+    r = client.get("/engine/audit", headers=admin, params={"action": "test.old", "limit": 2})
+    page = r.json()
+    assert len(page["items"]) == 2 and page["items"][0]["id"] > page["items"][1]["id"]
+    r = client.get("/engine/audit", headers=admin, params={"action": "test.old", "limit": 10, "cursor": page["next_cursor"]})
+    assert len(r.json()["items"]) == 3
+    assert audit_archive._segment_columns.cache_info().currsize == 1
+
+
+def test_audit_writer_falls_back_to_row_by_row_inserts(monkeypatch):
+    from datetime import datetime
+
+    from app import models
+    from app.core import audit_writer as aw
+    from app.database import SessionLocal
+
+    def broken_insert(*args, **kwargs):
+        raise RuntimeError("bulk insert unavailable")
+
+    monkeypatch.setattr(aw, "insert", broken_insert)
+    writer = aw.AuditWriter(max_queue=10, batch_size=10, flush_interval=0.01)
+    writer.start()
+    for i in range(3):
+        assert writer.submit(aw.AuditRecord(1, "test.fallback", "test", i, {"i": i}, None, datetime.utcnow()))
+    writer.stop()
+
+    assert writer.stats()["written_one_by_one"] == 3
+    assert writer.stats()["dropped"] == 0
+    db = SessionLocal()
+    try:
+        rows = db.query(models.AuditLog).filter(models.AuditLog.action == "test.fallback").order_by(models.AuditLog.entity_id).all()
+        assert [r.entity_id for r in rows] == [0, 1, 2]
+    finally:
+        db.close()
@@ -0,0 +1,45 @@
+from conftest import PASSWORD, auth_headers
+
+from app import models
+from app.core.config import settings
+from app.database import SessionLocal
+
+
+def _login(client, email: str) -> dict:
+    r = client.post("/auth/login", data={"username": email, "password": PASSWORD})
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def _me(client, access_token: str) -> int:
+    return client.get("/users/me", headers={"Authorization": f"Bearer {access_token}"}).status_code
+
+
+def test_refresh_tokens_are_single_use(client, monkeypatch):
+    monkeypatch.setattr(settings, "AUTH_STATELESS", True)
+    auth_headers(client, "refresh@test.com")
+    first = _login(client, "refresh@test.com")
+
+    r = client.post("/auth/refresh", json={"refresh_token": first["refresh_token"]})
+    assert r.status_code == 200, r.text
+    second = r.json()
+    assert second["refresh_token"] != first["refresh_token"]
+    assert _me(client, second["access_token"]) == 200
+
+    db = SessionLocal()
+    try:
+        assert db.query(models.UsedRefreshToken).join(models.User, models.User.id == models.UsedRefreshToken.user_id).filter(models.User.email == "refresh@test.com").count() == 1
+    finally:
+        db.close()
+
+    # replaying the spent token fails and, as a leak, revokes the whole session
+    r = client.post("/auth/refresh", json={"refresh_token": first["refresh_token"]})
+    assert r.status_code == 401
+    assert r.json()["detail"] == "Refresh token already used."
+    assert client.post("/auth/refresh", json={"refresh_token": second["refresh_token"]}).status_code == 401
+    assert _me(client, second["access_token"]) == 401
+
+    # a fresh login starts a new session
+    third = _login(client, "refresh@test.com")
+    assert _me(client, third["access_token"]) == 200
+    assert client.post("/auth/refresh", json={"refresh_token": third["refresh_token"]}).status_code == 200
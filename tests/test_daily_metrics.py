@@ -0,0 +1,60 @@
+from conftest import finalize, new_trader, open_entry
+
+from app import models
+from app.core.daily_metrics import apply_trade_results
+from app.core.lockout_index import utc_day_str
+from app.database import SessionLocal
+
+
+def _row(user_id: int, day: str) -> models.DailyMetric | None:
+    db = SessionLocal()
+    try:
+        return db.query(models.DailyMetric).filter(models.DailyMetric.user_id == user_id, models.DailyMetric.day == day).one_or_none()
+    finally:
+        db.close()
+
+
+def _state(dm: models.DailyMetric) -> tuple:
+    return dm.realized_pnl, dm.trades_today, dm.consecutive_losses, bool(dm.locked_out)
+
+
+def test_finalize_rolls_up_today_and_locks_out_at_the_limit(client):
+    headers, uid = new_trader(client, "metrics@test.com")  # loss limit 3% of 10000 = 300
+    today = utc_day_str()
+
+    expected = [(-100.0, 1, 1, False), (-50.0, 2, 0, False), (-170.0, 3, 1, False), (-320.0, 4, 2, True)]
+    for pnl, want in zip([-100, 50, -120, -150], expected):
+        finalize(client, headers, open_entry(client, headers), pnl)
+        assert _state(_row(uid, today)) == want
+
+    db = SessionLocal()
+    try:
+        assert db.query(models.DailyMetric).filter(models.DailyMetric.user_id == uid).count() == 1
+    finally:
+        db.close()
+
+
+def test_apply_trade_results_returns_the_row_it_wrote(client):
+    _, uid = new_trader(client, "metrics-returning@test.com")
+    day = "2031-03-01"
+    db = SessionLocal()
+    try:
+        first = apply_trade_results(db, uid, day, [-40.0, -30.0], loss_limit=100.0)
+        second = apply_trade_results(db, uid, day, [20.0, -60.0], loss_limit=100.0)
+        db.commit()
+    finally:
+        db.close()
+
+    assert (first.realized_pnl, first.trades_today, first.consecutive_losses, first.locked_out) == (-70.0, 2, 2, False)
+    # the win resets the streak; the new total (-110) crosses the 100 limit inside the same upsert
+    assert (second.realized_pnl, second.trades_today, second.consecutive_losses, second.locked_out) == (-110.0, 4, 1, True)
+    assert _state(_row(uid, day)) == (-110.0, 4, 1, True)
+
+    # a later winning batch never lifts the lockout by itself
+    db = SessionLocal()
+    try:
+        third = apply_trade_results(db, uid, day, [500.0], loss_limit=100.0)
+        db.commit()
+    finally:
+        db.close()
+    assert third.locked_out and _state(_row(uid, day)) == (390.0, 5, 0, True)
@@ -0,0 +1,62 @@
+import pytest
+from conftest import PLAN, finalize, new_trader, open_entry
+
+from app import models
+from app.core.lockout_index import utc_day_str
+from app.database import SessionLocal
+
+
+@pytest.mark.parametrize("extra", [
+    {"stop_losses": [1.09], "stop_range": {"start": 1.08, "end": 1.09, "steps": 3}},
+    {"stop_losses": [1.09], "take_profits": [1.12], "take_profit_range": {"start": 1.11, "end": 1.13, "steps": 3}},
+])
+def test_sweep_rejects_list_and_range_for_one_axis(client, trader, extra):
+    r = client.post("/engine/plan/sweep", headers=trader, json={"direction": "long", "entry_price": 1.1, **extra})
+    assert r.status_code == 422
+    assert "not both" in r.text
+
+
+def _gates(client, headers) -> tuple[bool, dict]:
+    r = client.post("/engine/plan/batch", headers=headers, json={"candidates": [PLAN]})
+    assert r.status_code == 200, r.text
+    plan = r.json()[0]
+    return plan["allowed"], {c["key"]: c["passed"] for c in plan["checklist"]}
+
+
+def test_max_trades_and_consecutive_losses_gates(client):
+    headers, uid = new_trader(client, "gates@test.com", max_daily_loss_pct=50, max_trades_per_day=3, max_consecutive_losses=2)
+
+    allowed, gates = _gates(client, headers)
+    assert allowed and gates["max_trades_per_day"] and gates["max_consecutive_losses"]
+
+    finalize(client, headers, open_entry(client, headers), -10)
+    allowed, gates = _gates(client, headers)
+    assert allowed and gates["max_consecutive_losses"]
+
+    finalize(client, headers, open_entry(client, headers), -10)
+    allowed, gates = _gates(client, headers)
+    assert not allowed
+    assert gates["max_trades_per_day"] and not gates["max_consecutive_losses"]
+
+    # a win resets the streak, but it is the third trade of the day
+    finalize(client, headers, open_entry(client, headers), 25)
+    allowed, gates = _gates(client, headers)
+    assert not allowed
+    assert not gates["max_trades_per_day"] and gates["max_consecutive_losses"]
+
+    db = SessionLocal()
+    try:
+        dm = db.query(models.DailyMetric).filter(models.DailyMetric.user_id == uid, models.DailyMetric.day == utc_day_str()).one()
+        assert (dm.trades_today, dm.consecutive_losses, dm.locked_out) == (3, 0, False)
+    finally:
+        db.close()
+
+    # /engine/commit enforces the same gates and writes nothing
+    r = client.post("/engine/commit", headers=headers, json=PLAN)
+    assert r.status_code == 400
+    assert "max trades per day reached (3)" in r.json()["detail"]["reasons"]
+    db = SessionLocal()
+    try:
+        assert db.query(models.Signal).filter(models.Signal.user_id == uid).count() == 0
+    finally:
+        db.close()
@@ -0,0 +1,101 @@
+"""Statement counts of the engine hot path, measured with app.core.query_counter."""
+import pytest
+from fastapi import Response
+from sqlalchemy import event
+
+from app import models, schemas
+from app.core.lockout_index import lockout_index
+from app.core.plan_cache import plan_cache
+from app.core.principal_cache import Principal
+from app.core.query_counter import count_queries
+from app.database import SessionLocal, engine as db_engine
+from app.routers import engine
+
+
+@pytest.fixture(scope="module")
+def plan_refs(client, trader):
+    rp = client.post(
+        "/trading/risk-profiles",
+        headers=trader,
+        json={"name": "default", "account_balance": 10000, "risk_per_trade_pct": 1, "max_daily_loss_pct": 3, "is_default": True},
+    ).json()
+    rp2 = client.post(
+        "/trading/risk-profiles",
+        headers=trader,
+        json={"name": "alt", "account_balance": 5000, "risk_per_trade_pct": 0.5, "max_daily_loss_pct": 2},
+    ).json()
+    st = client.post("/trading/strategies", headers=trader, json={"name": "breakout"}).json()
+    return st["id"], rp["id"], rp2["id"]
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def user(db, trader):
+    user = Principal.from_user(db.query(models.User).filter(models.User.email == "trader@test.com").one())
+    lockout_index.get(db, user.id)  # warm: plan previews read the daily state from the index
+    return user
+
+
+def _payload(strategy_id=None, risk_profile_id=None, entry=1.1) -> schemas.EnginePlanRequest:
+    return schemas.EnginePlanRequest(
+        market="forex",
+        symbol="EURUSD",
+        timeframe="1h",
+        direction="long",
+        entry_price=entry,
+        stop_loss=entry - 0.01,
+        take_profit=entry + 0.03,
+        strategy_id=strategy_id,
+        risk_profile_id=risk_profile_id,
+    )
+
+
+def test_single_plan_context_is_one_statement(db, user, plan_refs):
+    st_id, rp_id, _ = plan_refs
+    with count_queries() as qc:
+        ctx = engine.load_plan_context(db, user, [_payload(st_id, rp_id)])
+    assert qc.count == 1
+    assert st_id in ctx.strategies and rp_id in ctx.risk_profiles
+    assert ctx.default_risk_profile.id == rp_id
+
+
+def test_batch_plan_context_is_one_statement(db, user, plan_refs):
+    st_id, rp_id, rp2_id = plan_refs
+    payloads = [_payload(st_id, rp_id), _payload(None, rp2_id, 1.2), _payload(st_id, None, 1.3), _payload()]
+    with count_queries() as qc:
+        ctx = engine.load_plan_context(db, user, payloads)
+    assert qc.count == 1
+    assert set(ctx.risk_profiles) >= {rp_id, rp2_id}
+
+    plan_cache.clear()
+    with count_queries() as qc:
+        plans = engine.build_plans_cached(payloads, db, user)
+    assert qc.count == 1
+    assert len(plans) == len(payloads)
+
+
+def test_commit_is_one_read_and_one_write_transaction(db, user, plan_refs):
+    st_id, rp_id, _ = plan_refs
+    commits = []
+    listener = lambda conn: commits.append(conn)
+    event.listen(db_engine, "commit", listener)
+    try:
+        with count_queries() as qc:
+            result = engine.commit(_payload(st_id, rp_id), Response(), db, user)
+    finally:
+        event.remove(db_engine, "commit", listener)
+
+    assert result.signal.id is not None
+    assert qc.count == 3
+    assert qc.statements[0].startswith("SELECT")
+    assert [s.split()[2] for s in qc.statements[1:]] == ["signals", "trade_journal_entries"]
+    assert len(commits) == 1
+
@@ -0,0 +1,56 @@
+from conftest import new_trader, open_entry
+
+from app import models
+from app.core.lockout_index import utc_day_str
+from app.database import SessionLocal
+
+
+def _entries(ids: list[int]) -> dict[int, tuple]:
+    db = SessionLocal()
+    try:
+        T = models.TradeJournalEntry
+        return {j.id: (j.is_finalized, j.pnl) for j in db.query(T).filter(T.id.in_(ids))}
+    finally:
+        db.close()
+
+
+def _today(user_id: int):
+    db = SessionLocal()
+    try:
+        dm = db.query(models.DailyMetric).filter(models.DailyMetric.user_id == user_id, models.DailyMetric.day == utc_day_str()).one_or_none()
+        return None if dm is None else (dm.realized_pnl, dm.trades_today)
+    finally:
+        db.close()
+
+
+def test_bulk_finalize_rejects_the_batch_on_an_invalid_item(client):
+    headers, uid = new_trader(client, "bulk-strict@test.com")
+    good, no_exit = open_entry(client, headers), open_entry(client, headers)
+    items = [{"journal_id": good, "pnl": 40}, {"journal_id": no_exit}, {"journal_id": 999_999, "pnl": 1}]
+
+    r = client.post("/trading/journal/finalize", headers=headers, json={"items": items})
+    assert r.status_code == 422
+    assert {e["journal_id"] for e in r.json()["detail"]} == {no_exit, 999_999}
+
+    assert _entries([good, no_exit]) == {good: (False, None), no_exit: (False, None)}
+    assert _today(uid) is None
+
+
+def test_bulk_finalize_skip_invalid_commits_the_valid_items(client):
+    headers, uid = new_trader(client, "bulk-skip@test.com")
+    a, b, no_exit = open_entry(client, headers), open_entry(client, headers), open_entry(client, headers)
+    items = [{"journal_id": a, "pnl": 40}, {"journal_id": no_exit}, {"journal_id": b, "pnl": -15}]
+
+    r = client.post("/trading/journal/finalize", headers=headers, params={"skip_invalid": True}, json={"items": items})
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert [j["id"] for j in body["finalized"]] == [a, b]
+    assert [e["journal_id"] for e in body["errors"]] == [no_exit]
+
+    assert _entries([a, b, no_exit]) == {a: (True, 40.0), b: (True, -15.0), no_exit: (False, None)}
+    assert _today(uid) == (25.0, 2)
+
+    # a finalized entry can not be finalized again
+    r = client.post("/trading/journal/finalize", headers=headers, json={"items": [{"journal_id": a, "pnl": 1}]})
+    assert r.status_code == 422
+    assert _today(uid) == (25.0, 2)
@@ -0,0 +1,101 @@
+import json
+
+IMPORT_ROWS = [
+    {"market": "stocks", "symbol": "IMPT", "timeframe": "1d", "direction": "long", "entry_price": 10.0, "exit_price": 11.0, "units": 100, "closed_at": "2026-01-05T15:00:00Z"},
+    {"market": "stocks", "symbol": "IMPT", "timeframe": "1d", "direction": "short", "entry_price": 20.0, "exit_price": 19.5, "units": 200, "closed_at": "2026-01-05T16:00:00Z"},
+]
+
+
+def _import(client, headers, rows):
+    body = "\n".join(json.dumps(r) for r in rows).encode()
+    return client.post("/trading/journal/import", headers=headers, files={"file": ("trades.jsonl", body)})
+
+
+def _imported(client, headers):
+    items = client.get("/trading/journal", headers=headers, params={"limit": 100}).json()["items"]
+    return sorted((j for j in items if j["symbol"] == "IMPT"), key=lambda j: j["id"])
+
+
+def test_import_persists_position_size(client, trader):
+    r = _import(client, trader, IMPORT_ROWS)
+    assert r.status_code == 200, r.text
+    assert r.json()["imported"] == 2
+
+    entries = _imported(client, trader)
+    assert [j["position_size_units"] for j in entries] == [100, 200]
+    assert [j["pnl"] for j in entries] == [100.0, 100.0]
+    assert all(j["pnl_calc_mode"] == "fallback" for j in entries)
+
+
+def test_pnl_backfill_reprices_imported_rows_and_skips_unsized(client, admin, trader):
+    from datetime import datetime
+
+    from app import models
+    from app.database import SessionLocal
+
+    rows = [dict(r, symbol="BKFL", closed_at="2026-01-07T15:00:00Z") for r in IMPORT_ROWS]
+    assert _import(client, trader, rows).json()["imported"] == 2
+
+    db = SessionLocal()
+    try:
+        # a finalized, price-derived trade with no size anywhere (no signal, no units)
+        trader_id = db.query(models.User.id).filter(models.User.email == "trader@test.com").scalar()
+        unsized = models.TradeJournalEntry(
+            user_id=trader_id, market="stocks", symbol="BKFL", timeframe="1d", direction="long",
+            entry_price=10.0, exit_price=11.0, pnl=100.0, pnl_calc_mode="fallback", is_finalized=True,
+            closed_at=datetime(2026, 1, 7, 17, 0),
+        )
+        db.add(unsized)
+        db.commit()
+        unsized_id = unsized.id
+    finally:
+        db.close()
+
+    spec = client.post("/trading/symbol-specs", headers=admin, json={"market": "stocks", "symbol": "BKFL", "point_value": 2.0}).json()
+    result = client.post(f"/trading/symbol-specs/{spec['id']}/recompute-pnl", headers=admin).json()
+    assert result["scanned"] == 2 and result["updated"] == 2
+
+    entries = client.get("/trading/journal", headers=trader, params={"limit": 100}).json()["items"]
+    pnls = {j["id"]: (j["pnl"], j["pnl_calc_mode"]) for j in entries if j["symbol"] == "BKFL"}
+    assert pnls.pop(unsized_id) == (100.0, "fallback")
+    assert sorted(pnls.values()) == [(200.0, "spec"), (200.0, "spec")]
+
+    db = SessionLocal()
+    try:
+        dm = db.query(models.DailyMetric).filter(models.DailyMetric.user_id == trader_id, models.DailyMetric.day == "2026-01-07").one()
+        assert dm.realized_pnl == 500.0  # 2 x 200 re-priced + the untouched 100
+        assert dm.trades_today == 3
+    finally:
+        db.close()
+
+
+def test_pnl_backfill_leaves_a_reset_today_alone(client, admin):
+    from conftest import PLAN, new_trader
+
+    from app import models
+    from app.core.lockout_index import utc_day_str
+    from app.database import SessionLocal
+
+    headers, uid = new_trader(client, "backfill-today@test.com")
+    draft = client.post("/engine/commit", headers=headers, json=dict(PLAN, symbol="TDAY")).json()["journal_draft"]
+    assert client.post(f"/trading/journal/{draft['id']}/finalize", headers=headers, json={"exit_price": 1.12}).status_code == 200
+    assert client.post("/trading/metrics/reset-today", headers=headers).status_code == 200
+
+    def today_row():
+        db = SessionLocal()
+        try:
+            dm = db.query(models.DailyMetric).filter(models.DailyMetric.user_id == uid, models.DailyMetric.day == utc_day_str()).one()
+            return dm.realized_pnl, dm.trades_today
+        finally:
+            db.close()
+
+    spec = client.post("/trading/symbol-specs", headers=admin, json={"market": "forex", "symbol": "TDAY", "point_value": 2.0}).json()
+    result = client.post(f"/trading/symbol-specs/{spec['id']}/recompute-pnl", headers=admin).json()
+    assert (result["updated"], result["days_rebuilt"], result["days_skipped"]) == (1, 0, 1)
+    assert today_row() == (0.0, 0)
+
+    client.patch(f"/trading/symbol-specs/{spec['id']}", headers=admin, json={"point_value": 3.0})
+    result = client.post(f"/trading/symbol-specs/{spec['id']}/recompute-pnl", headers=admin, params={"include_today": True}).json()
+    assert (result["days_rebuilt"], result["days_skipped"]) == (1, 0)
+    pnl = client.get("/trading/journal", headers=headers).json()["items"][0]["pnl"]
+    assert today_row() == (pnl, 1)
@@ -0,0 +1,46 @@
+from conftest import PLAN, new_trader
+
+from app import models
+from app.database import SessionLocal
+
+
+def _signal(client, headers) -> int:
+    r = client.post("/engine/commit", headers=headers, json=PLAN)
+    assert r.status_code == 200, r.text
+    return r.json()["signal"]["id"]
+
+
+def test_bulk_transitions_apply_legal_moves_and_record_events(client, trader):
+    headers, uid = new_trader(client, "signals@test.com")
+    a, b = _signal(client, headers), _signal(client, headers)
+    foreign = _signal(client, trader)
+
+    items = [
+        {"signal_id": a, "status": "triggered"},
+        {"signal_id": a, "status": "executed"},  # walks on from the state set by the item above
+        {"signal_id": b, "status": "closed"},  # new -> closed is not allowed
+        {"signal_id": foreign, "status": "cancelled"},  # another user's signal
+    ]
+    r = client.post("/trading/signals/transitions", headers=headers, json={"items": items})
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert (body["applied"], body["failed"]) == (2, 2)
+    assert [x["ok"] for x in body["results"]] == [True, True, False, False]
+    assert body["results"][2]["error"] == "Invalid status transition: new -> closed"
+    assert body["results"][3]["error"] == "Signal not found"
+
+    db = SessionLocal()
+    try:
+        status = dict(db.query(models.Signal.id, models.Signal.status).filter(models.Signal.id.in_([a, b, foreign])))
+        assert status == {a: "executed", b: "new", foreign: "new"}
+        E = models.SignalEvent
+        events = db.query(E).filter(E.signal_id.in_([a, b, foreign])).order_by(E.id).all()
+        assert [(e.signal_id, e.from_status, e.to_status, e.source, e.actor_id, e.user_id) for e in events] == [
+            (a, "new", "triggered", "bulk", uid, uid),
+            (a, "triggered", "executed", "bulk", uid, uid),
+        ]
+    finally:
+        db.close()
+
+    history = client.get(f"/trading/signals/{a}/events", headers=headers).json()
+    assert [(e["from_status"], e["to_status"]) for e in history] == [("new", "triggered"), ("triggered", "executed")]
@@ -0,0 +1,50 @@
+from conftest import PLAN, new_trader
+
+from app import models
+from app.core.strategy_stats import rebuild_strategy_stats
+from app.database import SessionLocal
+
+FIELDS = ("trades", "wins", "losses", "gross_pnl", "gross_profit", "gross_loss", "rr_sum", "rr_count", "equity", "equity_peak", "max_drawdown")
+
+
+def _stat_row(user_id: int, strategy_id: int) -> dict:
+    db = SessionLocal()
+    try:
+        row = db.query(models.StrategyStat).filter(models.StrategyStat.user_id == user_id, models.StrategyStat.strategy_id == strategy_id).one()
+        return {f: getattr(row, f) for f in FIELDS}
+    finally:
+        db.close()
+
+
+def test_incremental_stats_match_rebuild(client):
+    headers, uid = new_trader(client, "stats@test.com")
+    strategy_id = client.post("/trading/strategies", headers=headers, json={"name": "pullback"}).json()["id"]
+    drafts = []
+    for _ in range(5):
+        r = client.post("/engine/commit", headers=headers, json=dict(PLAN, strategy_id=strategy_id))
+        assert r.status_code == 200, r.text
+        drafts.append(r.json()["journal_draft"]["id"])
+
+    # equity 100, 50, -30, 0, -120: peak 100, deepest drawdown 220, spread over single and bulk finalizes
+    pnls = [100, -50, -80, 30, -120]
+    for jid, pnl in zip(drafts[:2], pnls[:2]):
+        assert client.post(f"/trading/journal/{jid}/finalize", headers=headers, json={"pnl": pnl}).status_code == 200
+    r = client.post("/trading/journal/finalize", headers=headers, json={"items": [{"journal_id": j, "pnl": p} for j, p in zip(drafts[2:], pnls[2:])]})
+    assert r.status_code == 200, r.text
+
+    incremental = _stat_row(uid, strategy_id)
+    assert incremental["trades"] == 5 and (incremental["wins"], incremental["losses"]) == (2, 3)
+    assert incremental["gross_pnl"] == -120 and incremental["gross_profit"] == 130 and incremental["gross_loss"] == 250
+    assert incremental["equity_peak"] == 100 and incremental["max_drawdown"] == 220
+    assert incremental["rr_count"] == 5  # every draft carries the plan's RR
+
+    db = SessionLocal()
+    try:
+        assert rebuild_strategy_stats(db, uid) == 1
+    finally:
+        db.close()
+    rebuilt = _stat_row(uid, strategy_id)
+    assert rebuilt == incremental
+
+    stats = client.get("/trading/strategies/stats", headers=headers).json()
+    assert [(s["strategy_id"], s["trades"], s["max_drawdown"]) for s in stats] == [(strategy_id, 5, 220.0)]